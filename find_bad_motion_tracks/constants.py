@@ -0,0 +1,28 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Defaults shared between the UI and the analysis engines. These live here so
+# that registering the add-on doesn't have to import the engines.
+#
+
+# Anything within this percentile will get a badness score <= 1
+PERCENTILE = 80
+
+# If two points are further apart than this many percent of the image dimensions
+# they are not dups (at least not in this frame).
+DUP_MAXDIST_PERCENT = 0.5
+
+# The dups distance limit can be changed after scanning, but not to more than
+# this many percent of the image dimensions.
+DUP_MAXDIST_PERCENT_LIMIT = 2.0
@@ -11,9 +11,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import bisect
 import statistics
+from array import array
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, cast
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple, cast
 
 from bpy.types import (
     MovieClip,
@@ -21,15 +24,22 @@ from bpy.types import (
     MovieTrackingTrack,
 )
 
-# Anything within this percentile will get a badness score <= 1
-PERCENTILE = 80
+from .constants import PERCENTILE
+from .marker_spans import get_alive_tracks
+from .neighbours import find_nearest_neighbours
 
+# When comparing tracks to their neighbours rather than to all tracks, fall back
+# to comparing to all tracks for tracks with fewer neighbours than this
+MIN_NEIGHBOURS = 3
 
-@dataclass
-class TrackWithFloat:
-    track: MovieTrackingTrack
-    number: float
-    blame_frame: int
+# For each sample, the indices of its nearest neighbours in the same frame
+Neighbours = List[List[int]]
+
+# Compare each track's movement to this many of its own most recent movements
+JITTER_WINDOW = 9
+
+# Don't score jitter until a track has moved at least this many times
+JITTER_MIN_SAMPLES = 4
 
 
 @dataclass
@@ -38,81 +48,289 @@ class Badness:
     frame: int
 
 
-class BadnessCalculator:
-    def __init__(self, movements: List[TrackWithFloat]) -> None:
-        # Take the median of all numbers.
-        #
-        # FIXME: Should we give higher weights to locked tracks? Since a human
-        # has likely locked them because those tracks are known good?
-        median = statistics.median(map(lambda movement: movement.number, movements))
+def get_percentile_radius(
+    sorted_deviations: Sequence[float], percentile: int = PERCENTILE
+) -> float:
+    """
+    How far tracks generally deviate from the median.
+    """
+    # With PERCENTILE at 80, for a 10 item list, this will be 8
+    percentile_count = (len(sorted_deviations) * percentile) // 100
+    assert percentile_count < len(sorted_deviations)
 
-        # With PERCENTILE at 80, for a 10 item list, this will be 8
-        percentile_count = (len(movements) * PERCENTILE) // 100
-        assert 0 < percentile_count < len(movements)
+    # With PERCENTILE at 80, for a 10 item list, with indices 0-9, this will
+    # be 7, skipping the two last ones. Low percentiles on short lists get
+    # clamped to the smallest deviation.
+    percentile_index = max(percentile_count, 1) - 1
 
-        # With PERCENTILE at 80, for a 10 item list, with indices 0-9, this will
-        # be 7, skipping the two last ones.
-        percentile_index = percentile_count - 1
+    return sorted_deviations[percentile_index]
 
-        percentile_radius = sorted(
-            map(lambda movement: abs(movement.number - median), movements)
-        )[percentile_index]
 
-        self.median = median
-        self.percentile_radius = (
-            percentile_radius  # How far tracks generally deviate from the median
-        )
+def compute_badness(deviation: float, percentile_radius: float) -> float:
+    """
+    Figure out how much this track moved compared to the median and the
+    movement wiggle room.
+    """
+    return deviation / (
+        # Avoid division by zero by adding a small number. A lot of the
+        # movement numbers here are pixel coordinates in the 0-1 range. The
+        # idea behind 1/10k is that it should be in the same ballpark as one
+        # pixel.
+        percentile_radius + (1.0 / 10_000.0)
+    )
 
-    def compute_badness_score(self, movement: TrackWithFloat) -> float:
-        """
-        Figure out how much this track moved compared to the median and the
-        movement wiggle room.
-        """
-        return abs(movement.number - self.median) / (
-            # Avoid division by zero by adding a small number. A lot of the
-            # movement numbers here are pixel coordinates in the 0-1 range. The
-            # idea behind 1/10k is that it should be in the same ballpark as one
-            # pixel.
-            self.percentile_radius + (1.0 / 10_000.0)
-        )
 
+class WorstBadnesses:
+    """
+    The worst badness score so far for each track, indexed by track id.
 
-def update_badnesses(
-    badnesses: Dict[str, Badness], movements: List[TrackWithFloat]
-) -> None:
-    if not movements:
+    On ties the latest frame wins, unless keep_first is set.
+    """
+
+    __slots__ = ("amounts", "frames", "keep_first")
+
+    def __init__(self, track_count: int, keep_first: bool = False) -> None:
+        # Badness scores are never negative, so -1 means "no score yet"
+        self.amounts = [-1.0] * track_count
+        self.frames = [0] * track_count
+        self.keep_first = keep_first
+
+    def update(self, track_id: int, amount: float, frame: int) -> None:
+        worst = self.amounts[track_id]
+        if worst > amount or (worst == amount and self.keep_first):
+            return
+        self.amounts[track_id] = amount
+        self.frames[track_id] = frame
+
+    def to_dict(self, track_names: Sequence[str]) -> Dict[str, Badness]:
+        return {
+            track_names[track_id]: Badness(amount, self.frames[track_id])
+            for track_id, amount in enumerate(self.amounts)
+            if amount >= 0
+        }
+
+
+class FrameDeviations:
+    """
+    How far each track's movement in one frame is from the median movement.
+
+    This is all that's needed for computing badness scores at any percentile.
+    """
+
+    __slots__ = ("frame", "track_ids", "deviations", "sorted_deviations")
+
+    def __init__(
+        self,
+        frame: int,
+        track_ids: Sequence[int],
+        numbers: Sequence[float],
+        neighbours: Optional[Neighbours] = None,
+    ) -> None:
+        """
+        With neighbours, each number is compared to the median of its
+        neighbours' numbers rather than to the median of all numbers.
+        """
+        # FIXME: Should we give higher weights to locked tracks? Since a human
+        # has likely locked them because those tracks are known good?
+        median = statistics.median(numbers)
+
+        self.frame = frame
+        self.track_ids = array("i", track_ids)
+        if neighbours is None:
+            self.deviations = array("d", [abs(number - median) for number in numbers])
+        else:
+            self.deviations = array("d")
+            for number, number_neighbours in zip(numbers, neighbours):
+                local_median = median
+                if len(number_neighbours) >= MIN_NEIGHBOURS:
+                    local_median = statistics.median(
+                        [numbers[neighbour] for neighbour in number_neighbours]
+                    )
+                self.deviations.append(abs(number - local_median))
+        self.sorted_deviations = array("d", sorted(self.deviations))
+
+
+def summarize_frame(
+    frame: int,
+    track_ids: Sequence[int],
+    numbers: Sequence[float],
+    neighbours: Optional[Neighbours] = None,
+) -> Optional[FrameDeviations]:
+    if not numbers:
         # Nothing to see here, move along. Also, the median() call in the
-        # BadnessCalculator constructor throws an exception if called with no
+        # FrameDeviations constructor throws an exception if called with no
         # data.
-        return
+        return None
 
-    if len(movements) < 4:
+    if len(numbers) < 4:
         # To detect outliers we want a median, with one track on each side to
         # set the baseline, plus a fourth track that is potentially outlying.
         # With fewer tracks than that the badness score becomes too uncertain.
-        return
+        return None
+
+    return FrameDeviations(frame, track_ids, numbers, neighbours)
 
+
+def update_badnesses(
+    badnesses: WorstBadnesses,
+    locked: Sequence[bool],
+    frame_deviations: FrameDeviations,
+    percentile: int,
+) -> None:
     # For each track, keep track of the worst badness score so far
-    badness_calculator = BadnessCalculator(movements)
-    for movement in movements:
-        if movement.track.lock:
+    percentile_radius = get_percentile_radius(
+        frame_deviations.sorted_deviations, percentile
+    )
+    frame = frame_deviations.frame
+    for track_id, deviation in zip(
+        frame_deviations.track_ids, frame_deviations.deviations
+    ):
+        if locked[track_id]:
             # Assume locked tracks have been vetted by a human and that
             # they are perfect.
             continue
 
-        badness_score = badness_calculator.compute_badness_score(movement)
+        badnesses.update(track_id, compute_badness(deviation, percentile_radius), frame)
 
-        if movement.track.name not in badnesses:
-            badnesses[movement.track.name] = Badness(
-                badness_score, movement.blame_frame
-            )
-            continue
 
-        old_badness = badnesses[movement.track.name]
-        if old_badness.amount > badness_score:
-            continue
+class RollingWindow:
+    """
+    The most recent numbers of a series, kept both in arrival order and sorted.
+
+    Adding a number costs a binary search and a short list insert, so robust
+    statistics can be had without re-sorting the window for each number.
+    """
+
+    __slots__ = ("size", "numbers", "sorted_numbers")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.numbers: Deque[float] = deque()
+        self.sorted_numbers: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def clear(self) -> None:
+        self.numbers.clear()
+        self.sorted_numbers.clear()
 
-        badnesses[movement.track.name] = Badness(badness_score, movement.blame_frame)
+    def add(self, number: float) -> None:
+        if len(self.numbers) == self.size:
+            oldest = self.numbers.popleft()
+            del self.sorted_numbers[bisect.bisect_left(self.sorted_numbers, oldest)]
+
+        self.numbers.append(number)
+        bisect.insort(self.sorted_numbers, number)
+
+    def median(self) -> float:
+        count = len(self.sorted_numbers)
+        middle = count // 2
+        if count % 2 == 1:
+            return self.sorted_numbers[middle]
+        return (self.sorted_numbers[middle - 1] + self.sorted_numbers[middle]) / 2
+
+    def interquartile_range(self) -> float:
+        count = len(self.sorted_numbers)
+        return self.sorted_numbers[(count * 3) // 4] - self.sorted_numbers[count // 4]
+
+    def compute_badness(self, number: float) -> float:
+        """
+        How far is this number from the recent ones?
+        """
+        return compute_badness(abs(number - self.median()), self.interquartile_range())
+
+
+class JitterDetector:
+    """
+    Scores each track's movement against its own recent movements.
+
+    This catches tracks that jitter in frames where all tracks move a lot, and
+    where the jitter is small compared to how much tracks differ from each
+    other.
+    """
+
+    def __init__(self, locked: Sequence[bool], window_size: int) -> None:
+        self.locked = locked
+        self.window_size = window_size
+
+        # dx and dy windows by track id, created on first movement
+        self.windows: List[Optional[Tuple[RollingWindow, RollingWindow]]] = [
+            None
+        ] * len(locked)
+
+        # The last frame each track moved into
+        self.last_frames: List[Optional[int]] = [None] * len(locked)
+
+        self.badnesses = WorstBadnesses(len(locked))
+
+    def add_frame(self, movements: "FrameMovements") -> None:
+        for track_id, dx, dy in zip(movements.d_ids, movements.dx, movements.dy):
+            windows = self.windows[track_id]
+            if windows is None:
+                windows = (
+                    RollingWindow(self.window_size),
+                    RollingWindow(self.window_size),
+                )
+                self.windows[track_id] = windows
+            dx_window, dy_window = windows
+
+            if self.last_frames[track_id] != movements.frame - 1:
+                # After a gap the track may have been picked up on a different
+                # feature, so don't compare to how it moved before the gap
+                dx_window.clear()
+                dy_window.clear()
+            self.last_frames[track_id] = movements.frame
+
+            # Assume locked tracks have been vetted by a human and that they
+            # are perfect.
+            if len(dx_window) >= JITTER_MIN_SAMPLES and not self.locked[track_id]:
+                self.badnesses.update(
+                    track_id,
+                    max(dx_window.compute_badness(dx), dy_window.compute_badness(dy)),
+                    movements.frame,
+                )
+
+            dx_window.add(dx)
+            dy_window.add(dy)
+
+
+class FrameMovements:
+    """
+    How all tracks moved into one frame.
+
+    The same instance is cleared and refilled for every frame, so that we don't
+    allocate new lists for each frame.
+    """
+
+    __slots__ = ("frame", "d_ids", "x", "y", "dx", "dy", "dd_ids", "ddx", "ddy")
+
+    def __init__(self) -> None:
+        self.frame = 0
+
+        # Track ids, positions and movements of all tracks that moved into this
+        # frame
+        self.d_ids: List[int] = []
+        self.x: List[float] = []
+        self.y: List[float] = []
+        self.dx: List[float] = []
+        self.dy: List[float] = []
+
+        # Track ids and acceleration of tracks with two earlier markers
+        self.dd_ids: List[int] = []
+        self.ddx: List[float] = []
+        self.ddy: List[float] = []
+
+    def clear(self, frame: int) -> None:
+        self.frame = frame
+        self.d_ids.clear()
+        self.x.clear()
+        self.y.clear()
+        self.dx.clear()
+        self.dy.clear()
+        self.dd_ids.clear()
+        self.ddx.clear()
+        self.ddy.clear()
 
 
 def shape_change_amount(
@@ -141,25 +359,28 @@ def shape_change_amount(
     return dx + dy
 
 
-def combine_badnesses(*args: Dict[str, Badness]) -> Dict[str, Badness]:
+def combine_badnesses(
+    *args: Dict[str, Badness], percentile: int = PERCENTILE
+) -> Dict[str, Badness]:
     """
-    Scale each collection so that the 80th percentile is at 1.0. Then for
-    each track mentioned, pick the highest datapoint out of any collection.
+    Scale each collection so that the 80th (by default) percentile is at 1.0.
+    Then for each track mentioned, pick the highest datapoint out of any
+    collection.
     """
 
     with_percentile_scores: List[Tuple[Dict[str, Badness], float]] = []
     for track_to_badness in args:
         if len(track_to_badness) < 1:
             continue
-        percentile = sorted(
+        percentile_score = sorted(
             map(lambda badness: badness.amount, track_to_badness.values())
-        )[(len(track_to_badness) * PERCENTILE) // 100]
+        )[(len(track_to_badness) * percentile) // 100]
 
-        with_percentile_scores.append((track_to_badness, percentile))
+        with_percentile_scores.append((track_to_badness, percentile_score))
 
     # Join up the with_percentile_scores tuples into a resulting dict
     combined: Dict[str, Badness] = {}
-    for badnesses, percentile in with_percentile_scores:
+    for badnesses, percentile_score in with_percentile_scores:
         for track, badness in badnesses.items():
             to_beat_amount = 0.0
             to_beat = combined.get(track)
@@ -167,74 +388,247 @@ def combine_badnesses(*args: Dict[str, Badness]) -> Dict[str, Badness]:
                 to_beat_amount = to_beat.amount
 
             adjusted_amount = badness.amount
-            if percentile != 0:
-                adjusted_amount = badness.amount / percentile
+            if percentile_score != 0:
+                adjusted_amount = badness.amount / percentile_score
             if adjusted_amount > to_beat_amount or track not in combined:
                 combined[track] = Badness(adjusted_amount, badness.frame)
 
     return combined
 
 
-def find_bad_tracks(clip: MovieClip) -> Dict[str, Badness]:
-    # For each clip frame except the first...
-    first_frame_index = clip.frame_start
-    last_frame_index = clip.frame_start + clip.frame_duration - 1
+def generate_frame_movements(
+    tracks: Sequence[MovieTrackingTrack],
+    shape_badnesses: WorstBadnesses,
+    first_frame_index: int,
+    last_frame_index: int,
+) -> Iterator[FrameMovements]:
+    """
+    Walk all tracks' markers once in frame order, and yield how the tracks
+    moved into each frame except the first.
 
-    # Map track names to badness scores
-    dx_badnesses: Dict[str, Badness] = {}
-    dy_badnesses: Dict[str, Badness] = {}
-    ddx_badnesses: Dict[str, Badness] = {}
-    ddy_badnesses: Dict[str, Badness] = {}
-
-    # Map track names to marker shape change amounts
-    shape_badnesses: Dict[str, Badness] = {}
-
-    for frame_index in range(first_frame_index + 1, last_frame_index + 1):
-        dx_list: List[TrackWithFloat] = []
-        dy_list: List[TrackWithFloat] = []
-        ddx_list: List[TrackWithFloat] = []
-        ddy_list: List[TrackWithFloat] = []
-
-        tracks = cast(List[MovieTrackingTrack], clip.tracking.tracks)
-        for track in tracks:
-            previous_marker = track.markers.find_frame(frame_index - 1)
-            if previous_marker is None or previous_marker.mute:
-                continue
+    Only tracks with markers in a frame are looked at in that frame, so the
+    work scales with the number of markers rather than with the number of
+    tracks times the number of frames.
+
+    Marker shape changes are recorded into shape_badnesses along the way.
+
+    The yielded FrameMovements is reused, so consume it before asking for the
+    next one.
+    """
+    alive_tracks = get_alive_tracks(tracks, first_frame_index, last_frame_index)
+
+    # Per track state from the last frame the track had a usable marker in
+    previous_frames: List[Optional[int]] = [None] * len(tracks)
+    previous_markers: List[Optional[MovieTrackingMarker]] = [None] * len(tracks)
+    previous_cos: List[Tuple[float, float]] = [(0.0, 0.0)] * len(tracks)
+    previous_deltas: List[Optional[Tuple[float, float]]] = [None] * len(tracks)
 
-            marker = track.markers.find_frame(frame_index)
+    movements = FrameMovements()
+    for frame_index, track_ids in enumerate(alive_tracks, first_frame_index):
+        movements.clear(frame_index)
+
+        for track_id in track_ids:
+            marker = tracks[track_id].markers.find_frame(frame_index)
             if marker is None or marker.mute:
                 continue
 
-            highest_shape_change = shape_badnesses.get(track.name, None)
-            shape_change = shape_change_amount(previous_marker, marker)
-            if (
-                highest_shape_change is None
-                or shape_change > highest_shape_change.amount
-            ):
-                shape_badnesses[track.name] = Badness(shape_change, frame_index)
+            previous_marker = previous_markers[track_id]
+            previous_delta = previous_deltas[track_id]
+            if previous_frames[track_id] != frame_index - 1:
+                # The track has a gap since it was last seen
+                previous_marker = None
+                previous_delta = None
+            previous_frames[track_id] = frame_index
+
+            co = marker.co
+            x: float = co[0]
+            y: float = co[1]
+
+            previous_markers[track_id] = marker
+            previous_x, previous_y = previous_cos[track_id]
+            previous_cos[track_id] = (x, y)
+            if previous_marker is None:
+                previous_deltas[track_id] = None
+                continue
 
-            # How much did this track move X and Y since the previous frame?
-            dx = marker.co[0] - previous_marker.co[0]
-            dy = marker.co[1] - previous_marker.co[1]
-            dx_list.append(TrackWithFloat(track, dx, frame_index))
-            dy_list.append(TrackWithFloat(track, dy, frame_index))
+            shape_badnesses.update(
+                track_id, shape_change_amount(previous_marker, marker), frame_index
+            )
 
-            previous_previous_marker = track.markers.find_frame(frame_index - 2)
-            if previous_previous_marker is None or previous_previous_marker.mute:
+            # How much did this track move X and Y since the previous frame?
+            dx = x - previous_x
+            dy = y - previous_y
+            movements.d_ids.append(track_id)
+            movements.x.append(x)
+            movements.y.append(y)
+            movements.dx.append(dx)
+            movements.dy.append(dy)
+
+            previous_deltas[track_id] = (dx, dy)
+            if previous_delta is None:
                 continue
 
-            previous_dx = previous_marker.co[0] - previous_previous_marker.co[0]
-            previous_dy = previous_marker.co[1] - previous_previous_marker.co[1]
-            ddx = dx - previous_dx
-            ddy = dy - previous_dy
-            ddx_list.append(TrackWithFloat(track, ddx, frame_index))
-            ddy_list.append(TrackWithFloat(track, ddy, frame_index))
+            movements.dd_ids.append(track_id)
+            movements.ddx.append(dx - previous_delta[0])
+            movements.ddy.append(dy - previous_delta[1])
+
+        if frame_index > first_frame_index:
+            yield movements
 
-        update_badnesses(dx_badnesses, dx_list)
-        update_badnesses(dy_badnesses, dy_list)
-        update_badnesses(ddx_badnesses, ddx_list)
-        update_badnesses(ddy_badnesses, ddy_list)
 
-    return combine_badnesses(
-        dx_badnesses, dy_badnesses, ddx_badnesses, ddy_badnesses, shape_badnesses
+class TrackScores:
+    """
+    Per frame deviation summaries of all tracks' movements. From these, badness
+    scores can be computed for any percentile without looking at the markers
+    again.
+    """
+
+    def __init__(
+        self,
+        track_names: List[str],
+        locked: List[bool],
+        channels: List[List[FrameDeviations]],
+        fixed_badnesses: List[WorstBadnesses],
+    ) -> None:
+        self.track_names = track_names
+        self.locked = locked
+
+        # dx, dy, ddx and ddy summaries, one entry per frame
+        self.channels = channels
+
+        # Channels that don't depend on the percentile, like marker shape
+        # changes and jitter
+        self.fixed_badnesses = [
+            badnesses.to_dict(track_names) for badnesses in fixed_badnesses
+        ]
+
+    def exclude_tracks(self, names: Set[str]) -> None:
+        """
+        Stop scoring these tracks, for example because they have been deleted.
+        """
+        for track_id, name in enumerate(self.track_names):
+            if name in names:
+                # Locked tracks don't get scored
+                self.locked[track_id] = True
+        for badnesses in self.fixed_badnesses:
+            for name in names:
+                badnesses.pop(name, None)
+
+    def score(self, percentile: int = PERCENTILE) -> Dict[str, Badness]:
+        assert 0 < percentile < 100
+
+        channel_badnesses: List[Dict[str, Badness]] = []
+        for channel in self.channels:
+            badnesses = WorstBadnesses(len(self.track_names))
+            for frame_deviations in channel:
+                update_badnesses(badnesses, self.locked, frame_deviations, percentile)
+            channel_badnesses.append(badnesses.to_dict(self.track_names))
+
+        return combine_badnesses(
+            *channel_badnesses, *self.fixed_badnesses, percentile=percentile
+        )
+
+
+def get_frame_neighbours(
+    movements: FrameMovements, neighbour_count: int
+) -> Tuple[Neighbours, Neighbours]:
+    """
+    Nearest neighbours for the movement samples and for the acceleration
+    samples of one frame.
+
+    The spatial index is built once per frame. Acceleration samples get the
+    movement sample neighbours that have acceleration samples as well.
+    """
+    d_neighbours = find_nearest_neighbours(movements.x, movements.y, neighbour_count)
+
+    dd_index_by_track_id = {
+        track_id: dd_index for dd_index, track_id in enumerate(movements.dd_ids)
+    }
+    dd_neighbours: Neighbours = [[] for _ in movements.dd_ids]
+    for track_id, neighbours in zip(movements.d_ids, d_neighbours):
+        dd_index = dd_index_by_track_id.get(track_id)
+        if dd_index is None:
+            continue
+        for neighbour in neighbours:
+            neighbour_dd_index = dd_index_by_track_id.get(movements.d_ids[neighbour])
+            if neighbour_dd_index is not None:
+                dd_neighbours[dd_index].append(neighbour_dd_index)
+
+    return d_neighbours, dd_neighbours
+
+
+def analyze_tracks(
+    clip: MovieClip,
+    neighbour_count: int = 0,
+    jitter_window: int = JITTER_WINDOW,
+) -> TrackScores:
+    """
+    With neighbour_count > 0, each track is compared to that many of its
+    nearest neighbours in each frame, rather than to all tracks. This keeps
+    tracks on a foreground object from being flagged just because the
+    foreground moves differently from the background.
+
+    Each track is also compared to its own jitter_window most recent movements,
+    0 disables that.
+    """
+    assert neighbour_count >= 0
+    assert jitter_window >= 0
+
+    first_frame_index = clip.frame_start
+    last_frame_index = clip.frame_start + clip.frame_duration - 1
+
+    tracks = list(cast(List[MovieTrackingTrack], clip.tracking.tracks))
+    track_names = [track.name for track in tracks]
+    locked = [bool(track.lock) for track in tracks]
+
+    # Largest marker shape change amounts by track id. Tracks that never change
+    # shape get blamed on their first frame.
+    shape_badnesses = WorstBadnesses(len(tracks), keep_first=True)
+
+    frame_movements = generate_frame_movements(
+        tracks, shape_badnesses, first_frame_index, last_frame_index
     )
+
+    jitter_detector: Optional[JitterDetector] = None
+    if jitter_window > 0:
+        jitter_detector = JitterDetector(locked, jitter_window)
+
+    d_neighbours: Optional[Neighbours] = None
+    dd_neighbours: Optional[Neighbours] = None
+
+    # dx, dy, ddx and ddy summaries
+    summaries: List[List[FrameDeviations]] = [[], [], [], []]
+    for movements in frame_movements:
+        frame = movements.frame
+        if jitter_detector is not None:
+            jitter_detector.add_frame(movements)
+        if neighbour_count > 0:
+            d_neighbours, dd_neighbours = get_frame_neighbours(
+                movements, neighbour_count
+            )
+        for summary_list, track_ids, numbers, neighbours in zip(
+            summaries,
+            (movements.d_ids, movements.d_ids, movements.dd_ids, movements.dd_ids),
+            (movements.dx, movements.dy, movements.ddx, movements.ddy),
+            (d_neighbours, d_neighbours, dd_neighbours, dd_neighbours),
+        ):
+            summary = summarize_frame(frame, track_ids, numbers, neighbours)
+            if summary is not None:
+                summary_list.append(summary)
+
+    fixed_badnesses = [shape_badnesses]
+    if jitter_detector is not None:
+        fixed_badnesses.append(jitter_detector.badnesses)
+
+    return TrackScores(track_names, locked, summaries, fixed_badnesses)
+
+
+def find_bad_tracks(
+    clip: MovieClip,
+    neighbour_count: int = 0,
+    jitter_window: int = JITTER_WINDOW,
+) -> Dict[str, Badness]:
+    """
+    See analyze_tracks() for the parameters.
+    """
+    return analyze_tracks(clip, neighbour_count, jitter_window).score()
@@ -19,15 +19,17 @@ from bpy.types import (
     MovieTrackingMarkers,
 )
 
-# If two points are further apart than this many percent of the image dimensions
-# they are not dups (at least not in this frame).
-DUP_MAXDIST_PERCENT = 0.5
+from .constants import DUP_MAXDIST_PERCENT, DUP_MAXDIST_PERCENT_LIMIT
+from .marker_spans import get_alive_tracks
 
 
 class Duplicate:
     dup_maxdist_fraction = DUP_MAXDIST_PERCENT / 100.0
     dup_maxdist2 = dup_maxdist_fraction * dup_maxdist_fraction
 
+    dup_maxdist_limit_fraction = DUP_MAXDIST_PERCENT_LIMIT / 100.0
+    dup_maxdist_limit2 = dup_maxdist_limit_fraction * dup_maxdist_limit_fraction
+
     def __init__(
         self, track1_name: str, track2_name: str, frame_number: int, distance2: float
     ) -> None:
@@ -38,8 +40,15 @@ class Duplicate:
         self.first_common_frame = frame_number
         self.last_common_frame = frame_number
 
-        self.first_overlapping_frame: Optional[int] = None
-        self.last_overlapping_frame: Optional[int] = None
+        # Frames and distances where the tracks came closer than in any earlier
+        # frame. Distances are decreasing. The first frame in here that is
+        # close enough is the first overlapping frame.
+        self.closer_frames: List[Tuple[int, float]] = []
+
+        # Frames and distances where the tracks were closer than in any later
+        # frame. Distances are increasing. The last frame in here that is close
+        # enough is the last overlapping frame.
+        self.last_close_frames: List[Tuple[int, float]] = []
 
         self.update(frame_number, distance2)
 
@@ -49,41 +58,115 @@ class Duplicate:
 
         self.last_common_frame = frame_number
 
-        if distance2 > Duplicate.dup_maxdist2:
+        if distance2 > Duplicate.dup_maxdist_limit2:
             return
 
-        # Tracks are overlapping
-        if self.first_overlapping_frame is None:
-            self.first_overlapping_frame = frame_number
-        self.last_overlapping_frame = frame_number
+        # Tracks are overlapping for some distance limit
+        self.add_close_frame(frame_number, distance2)
+
+    def add_close_frame(self, frame_number: int, distance2: float) -> None:
+        if not self.closer_frames or distance2 < self.closer_frames[-1][1]:
+            self.closer_frames.append((frame_number, distance2))
+
+        while self.last_close_frames and self.last_close_frames[-1][1] >= distance2:
+            self.last_close_frames.pop()
+        self.last_close_frames.append((frame_number, distance2))
+
+    def first_overlapping_frame(
+        self, maxdist2: Optional[float] = None
+    ) -> Optional[int]:
+        if maxdist2 is None:
+            maxdist2 = Duplicate.dup_maxdist2
+        for frame_number, distance2 in self.closer_frames:
+            if distance2 <= maxdist2:
+                return frame_number
+        return None
+
+    def last_overlapping_frame(self, maxdist2: Optional[float] = None) -> Optional[int]:
+        if maxdist2 is None:
+            maxdist2 = Duplicate.dup_maxdist2
+        for frame_number, distance2 in reversed(self.last_close_frames):
+            if distance2 <= maxdist2:
+                return frame_number
+        return None
+
+    def are_dups(self, maxdist2: Optional[float] = None) -> bool:
+        """
+        With maxdist2 unset, DUP_MAXDIST_PERCENT is used. Otherwise maxdist2 must
+        be at most dup_maxdist_limit2.
+        """
+        return self.first_overlapping_frame(maxdist2) is not None
+
+    def most_interesting_frame(self, maxdist2: Optional[float] = None) -> int:
+        first_overlapping_frame = self.first_overlapping_frame(maxdist2)
+        last_overlapping_frame = self.last_overlapping_frame(maxdist2)
+        assert first_overlapping_frame is not None
+        assert last_overlapping_frame is not None
+
+        if last_overlapping_frame < self.last_common_frame:
+            # We stop overlapping and drift apart
+            return last_overlapping_frame
 
-    def are_dups(self) -> bool:
-        return self.first_overlapping_frame is not None
+        return first_overlapping_frame
 
-    def most_interesting_frame(self) -> int:
-        assert self.first_overlapping_frame is not None
-        assert self.last_overlapping_frame is not None
 
-        if self.last_overlapping_frame < self.last_common_frame:
-            # We stop overlapping and drift apart
-            return self.last_overlapping_frame
+# Marker x and y coordinates and track names of all tracks in one frame
+FrameCoordinates = List[Tuple[float, float, str]]
 
-        return self.first_overlapping_frame
 
+def update_dups(
+    dups: Dict[Tuple[str, str], Duplicate],
+    frame_index: int,
+    track_coordinates: FrameCoordinates,
+) -> None:
+    for x1, y1, track1_name in track_coordinates:
+        for x2, y2, track2_name in track_coordinates:
+            if track1_name >= track2_name:
+                # Require alphabetic order to avoid duplicates
+                #
+                # FIXME: It should be possible to make these nested loops
+                # twice as fast by ensuring the tracks are sorted in name
+                # order and doing "break" here under the right
+                # circumstances.
+                continue
 
-def find_duplicate_tracks(clip: MovieClip) -> Iterable[Duplicate]:
+            dx = x2 - x1
+            dy = y2 - y1
+            dist2 = dx * dx + dy * dy
+
+            key = (track1_name, track2_name)
+            dup = dups.get(key)
+            if dup is None:
+                dup = Duplicate(track1_name, track2_name, frame_index, dist2)
+                dups[key] = dup
+            dup.update(frame_index, dist2)
+
+
+def find_duplicate_tracks(
+    clip: MovieClip,
+    maxdist2: Optional[float] = None,
+) -> Iterable[Duplicate]:
+    """
+    Find track pairs that come closer than sqrt(maxdist2) in some frame. If
+    maxdist2 is unset, DUP_MAXDIST_PERCENT is used.
+    """
     # For each clip frame...
     first_frame_index = clip.frame_start
     last_frame_index = clip.frame_start + clip.frame_duration - 1
 
-    # Map track names to badness scores
+    # Map track name pairs to how close they are
     dups: Dict[Tuple[str, str], Duplicate] = {}
 
-    for frame_index in range(first_frame_index, last_frame_index + 1):
-        track_coordinates = []
+    tracks = list(cast(List[MovieTrackingTrack], clip.tracking.tracks))
+
+    # Only look up markers for the tracks that have them in each frame
+    alive_tracks = get_alive_tracks(tracks, first_frame_index, last_frame_index)
+
+    for frame_index, track_ids in enumerate(alive_tracks, first_frame_index):
+        track_coordinates: FrameCoordinates = []
 
-        tracks = cast(List[MovieTrackingTrack], clip.tracking.tracks)
-        for track in tracks:
+        for track_id in track_ids:
+            track = tracks[track_id]
             markers = cast(MovieTrackingMarkers, track.markers)
             marker = markers.find_frame(frame_index)
             if marker is None or marker.mute:
@@ -94,27 +177,7 @@ def find_duplicate_tracks(clip: MovieClip) -> Iterable[Duplicate]:
 
             track_coordinates.append((x, y, track.name))
 
-        for x1, y1, track1_name in track_coordinates:
-            for x2, y2, track2_name in track_coordinates:
-                if track1_name >= track2_name:
-                    # Require alphabetic order to avoid duplicates
-                    #
-                    # FIXME: It should be possible to make these nested loops
-                    # twice as fast by ensuring the tracks are sorted in name
-                    # order and doing "break" here under the right
-                    # circumstances.
-                    continue
-
-                dx = x2 - x1
-                dy = y2 - y1
-                dist2 = dx * dx + dy * dy
-
-                key = (track1_name, track2_name)
-                dup = dups.get(key)
-                if dup is None:
-                    dup = Duplicate(track1_name, track2_name, frame_index, dist2)
-                    dups[key] = dup
-                dup.update(frame_index, dist2)
+        update_dups(dups, frame_index, track_coordinates)
 
     # Return the track pairs that come close enough at some point
-    return filter(lambda dup: dup.are_dups(), dups.values())
+    return filter(lambda dup: dup.are_dups(maxdist2), dups.values())
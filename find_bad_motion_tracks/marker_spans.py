@@ -0,0 +1,69 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Auto detected tracks usually cover only a small part of a clip. Instead of
+# asking every track for a marker in every frame, we find out up front which
+# frames each track has usable markers in.
+#
+
+from typing import List, Sequence, Tuple
+
+from bpy.types import MovieTrackingTrack
+
+
+def get_marker_spans(track: MovieTrackingTrack) -> List[Tuple[int, int]]:
+    """
+    First and last frame numbers of each run of consecutive unmuted markers.
+    """
+    markers = track.markers
+    count = len(markers)
+    frames = [0] * count
+    mutes = [False] * count
+    markers.foreach_get("frame", frames)
+    markers.foreach_get("mute", mutes)
+
+    spans: List[Tuple[int, int]] = []
+    for frame, mute in sorted(zip(frames, mutes)):
+        if mute:
+            continue
+        if spans and spans[-1][1] == frame - 1:
+            spans[-1] = (spans[-1][0], frame)
+        else:
+            spans.append((frame, frame))
+
+    return spans
+
+
+def get_alive_tracks(
+    tracks: Sequence[MovieTrackingTrack],
+    first_frame_index: int,
+    last_frame_index: int,
+) -> List[List[int]]:
+    """
+    For every frame from first_frame_index to last_frame_index, the ids (indices
+    into tracks) of the tracks with unmuted markers in that frame, in track id
+    order.
+    """
+    frame_count = last_frame_index - first_frame_index + 1
+    alive: List[List[int]] = [[] for _ in range(frame_count)]
+
+    for track_id, track in enumerate(tracks):
+        for span_start, span_end in get_marker_spans(track):
+            start = max(span_start, first_frame_index)
+            end = min(span_end, last_frame_index)
+
+            for frame in range(start, end + 1):
+                alive[frame - first_frame_index].append(track_id)
+
+    return alive
@@ -0,0 +1,128 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Opt-in memory instrumentation for the analysis pipeline.
+#
+# Set FIND_BAD_TRACKS_PROFILE_MEMORY=1 in the environment before starting
+# Blender to get a per-stage memory report printed on the console.
+#
+
+import gc
+import os
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+
+from .find_bad_tracks import Badness
+from .find_duplicate_tracks import Duplicate
+
+ENV_VARIABLE = "FIND_BAD_TRACKS_PROFILE_MEMORY"
+
+# How many allocation sites to report for each stage
+TOP_SITES_COUNT = 5
+
+# Count live instances of these classes at the end of each stage
+COUNTED_CLASSES = (Duplicate, Badness)
+
+
+def is_enabled() -> bool:
+    return os.environ.get(ENV_VARIABLE, "") not in ("", "0")
+
+
+@dataclass
+class StageMemory:
+    name: str
+
+    # Bytes still allocated at the end of the stage
+    allocated: int = 0
+
+    # Highest number of bytes allocated at any point during the stage
+    peak: int = 0
+
+    # Allocation sites as "file:line" and how many bytes they grew by
+    top_sites: List[Tuple[str, int]] = field(default_factory=list)
+
+    # Class names to how many instances were alive at the end of the stage
+    live_objects: Dict[str, int] = field(default_factory=dict)
+
+
+class MemoryProfiler:
+    """
+    Records per-stage memory usage. When not enabled, stages cost nothing.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.stages: List[StageMemory] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        try:
+            before_snapshot = tracemalloc.take_snapshot()
+            before_bytes, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+            yield
+
+            after_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            after_snapshot = tracemalloc.take_snapshot()
+
+            stage = StageMemory(
+                name,
+                allocated=after_bytes - before_bytes,
+                peak=peak_bytes - before_bytes,
+            )
+            for diff in after_snapshot.compare_to(before_snapshot, "lineno")[
+                :TOP_SITES_COUNT
+            ]:
+                frame = diff.traceback[0]
+                stage.top_sites.append(
+                    (f"{frame.filename}:{frame.lineno}", diff.size_diff)
+                )
+            stage.live_objects = count_live_objects()
+            self.stages.append(stage)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+    def report(self) -> str:
+        lines: List[str] = []
+        for stage in self.stages:
+            lines.append(
+                f"{stage.name}: peak {stage.peak / 1024:.0f}kB,"
+                f" retained {stage.allocated / 1024:.0f}kB"
+            )
+            for class_name, count in stage.live_objects.items():
+                lines.append(f"  live {class_name} objects: {count}")
+            for site, size in stage.top_sites:
+                lines.append(f"  {size / 1024:+.0f}kB {site}")
+        return "\n".join(lines)
+
+
+def count_live_objects() -> Dict[str, int]:
+    counts = {cls.__name__: 0 for cls in COUNTED_CLASSES}
+    for obj in gc.get_objects():
+        for cls in COUNTED_CLASSES:
+            if isinstance(obj, cls):
+                counts[cls.__name__] += 1
+    return counts
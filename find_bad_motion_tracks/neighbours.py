@@ -0,0 +1,126 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import heapq
+from typing import List, Sequence, Tuple
+
+# Stop splitting nodes with at most this many points
+LEAF_SIZE = 8
+
+# Node axis for leaves
+LEAF = -1
+
+
+class KDTree:
+    """
+    2D tree over a set of points, for finding nearest neighbours without
+    comparing every point to every other point.
+
+    Nodes are split at their median point along their widest axis, so densely
+    clustered points end up in small nodes and sparse points in large ones.
+    """
+
+    def __init__(self, xs: Sequence[float], ys: Sequence[float]) -> None:
+        assert len(xs) == len(ys)
+        self.coordinates = (xs, ys)
+
+        # Point indices, each node owns a contiguous slice of these
+        self.order = list(range(len(xs)))
+
+        # Per node: start, end, axis, split value, low child, high child
+        self.nodes: List[Tuple[int, int, int, float, int, int]] = []
+        self.root = self.build(0, len(xs))
+
+    def build(self, start: int, end: int) -> int:
+        node = len(self.nodes)
+        self.nodes.append((start, end, LEAF, 0.0, -1, -1))
+        if end - start <= LEAF_SIZE:
+            return node
+
+        xs, ys = self.coordinates
+        points = self.order[start:end]
+        width = max(xs[i] for i in points) - min(xs[i] for i in points)
+        height = max(ys[i] for i in points) - min(ys[i] for i in points)
+        if width == 0 and height == 0:
+            # All in the same spot, splitting won't help
+            return node
+
+        axis = 0 if width >= height else 1
+        values = self.coordinates[axis]
+        points.sort(key=values.__getitem__)
+        self.order[start:end] = points
+
+        middle = (start + end) // 2
+        split = values[points[middle - start]]
+        low = self.build(start, middle)
+        high = self.build(middle, end)
+        self.nodes[node] = (start, end, axis, split, low, high)
+        return node
+
+    def nearest(self, index: int, count: int) -> List[int]:
+        """
+        The indices of the count points closest to the point at index, closest
+        first. The point itself is not included. Ties go to the lower index.
+        """
+        if count <= 0:
+            return []
+
+        xs, ys = self.coordinates
+        x = xs[index]
+        y = ys[index]
+        point = (x, y)
+
+        # Max-heap of (-distance2, -index) of the best ones found so far
+        best: List[Tuple[float, int]] = []
+
+        # (node, minimum distance2 from the point to anything in it)
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, reach2 = stack.pop()
+            if len(best) == count and reach2 > -best[0][0]:
+                # On ties we look anyway, since there may be lower indices
+                continue
+
+            start, end, axis, split, low, high = self.nodes[node]
+            if axis == LEAF:
+                for other in self.order[start:end]:
+                    if other == index:
+                        continue
+                    dx = xs[other] - x
+                    dy = ys[other] - y
+                    candidate = (-(dx * dx + dy * dy), -other)
+                    if len(best) < count:
+                        heapq.heappush(best, candidate)
+                    elif candidate > best[0]:
+                        heapq.heapreplace(best, candidate)
+                continue
+
+            distance = point[axis] - split
+            near, far = (low, high) if distance < 0 else (high, low)
+            stack.append((far, max(reach2, distance * distance)))
+            stack.append((near, reach2))
+
+        return [-other for _, other in sorted(best, reverse=True)]
+
+
+def find_nearest_neighbours(
+    xs: Sequence[float], ys: Sequence[float], count: int
+) -> List[List[int]]:
+    """
+    For each point, the indices of its count nearest neighbours.
+    """
+    if not xs:
+        return []
+
+    tree = KDTree(xs, ys)
+    return [tree.nearest(i, count) for i in range(len(xs))]
@@ -0,0 +1,276 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Saved results, and reports on what changed between two saved results.
+#
+# This file doesn't depend on Blender, so that snapshots can be compared from
+# the command line:
+#
+#   python find_bad_motion_tracks/snapshots.py before.json after.json
+#
+# Given two directories, snapshots with the same file names are compared.
+#
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SNAPSHOT_VERSION = 1
+
+# Tracks with at least this badness count as bad in reports
+MIN_BADNESS = 2.0
+
+# Bad tracks whose badness grew by at least this factor count as worsened
+WORSENED_FACTOR = 1.25
+
+
+@dataclass
+class Snapshot:
+    # Track names to their badness scores and worst frames
+    bad_tracks: Dict[str, Tuple[float, int]] = field(default_factory=dict)
+
+    # Track name pairs, in name order, to the frame they overlap in
+    duplicates: Dict[Tuple[str, str], int] = field(default_factory=dict)
+
+
+def save_snapshot(snapshot: Snapshot, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(
+            {
+                "version": SNAPSHOT_VERSION,
+                "bad_tracks": {
+                    name: [badness, frame]
+                    for name, (badness, frame) in snapshot.bad_tracks.items()
+                },
+                "duplicates": [
+                    [track1_name, track2_name, frame]
+                    for (track1_name, track2_name), frame in snapshot.duplicates.items()
+                ],
+            },
+            output,
+        )
+
+
+def load_snapshot(path: str) -> Snapshot:
+    with open(path, encoding="utf-8") as source:
+        data = json.load(source)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: Not a snapshot")
+
+    version = data.get("version")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: Unsupported snapshot version {version}")
+
+    return Snapshot(
+        bad_tracks={
+            name: (float(badness), int(frame))
+            for name, (badness, frame) in data["bad_tracks"].items()
+        },
+        duplicates={
+            pair_key(track1_name, track2_name): int(frame)
+            for track1_name, track2_name, frame in data["duplicates"]
+        },
+    )
+
+
+def pair_key(track1_name: str, track2_name: str) -> Tuple[str, str]:
+    if track2_name < track1_name:
+        return (track2_name, track1_name)
+    return (track1_name, track2_name)
+
+
+@dataclass
+class SnapshotDiff:
+    # Tracks that are bad now but weren't before, worst first
+    new_bad_tracks: List[str] = field(default_factory=list)
+
+    # Tracks that were bad before but aren't now or are gone, worst first
+    fixed_bad_tracks: List[str] = field(default_factory=list)
+
+    # Tracks that were bad before and are a lot worse now, worst first
+    worsened_bad_tracks: List[str] = field(default_factory=list)
+
+    new_duplicates: List[Tuple[str, str]] = field(default_factory=list)
+    fixed_duplicates: List[Tuple[str, str]] = field(default_factory=list)
+
+    def has_regressions(self) -> bool:
+        return bool(
+            self.new_bad_tracks or self.worsened_bad_tracks or self.new_duplicates
+        )
+
+
+def diff_snapshots(
+    before: Snapshot,
+    after: Snapshot,
+    min_badness: float = MIN_BADNESS,
+    worsened_factor: float = WORSENED_FACTOR,
+) -> SnapshotDiff:
+    """
+    Both snapshots are walked once, with lookups into the other snapshot's
+    dicts, so this is linear in the number of tracks.
+    """
+    diff = SnapshotDiff()
+
+    for name, (badness, _) in after.bad_tracks.items():
+        if badness < min_badness:
+            continue
+        before_badness = before.bad_tracks.get(name, (0.0, 0))[0]
+        if before_badness < min_badness:
+            diff.new_bad_tracks.append(name)
+        elif badness >= before_badness * worsened_factor:
+            diff.worsened_bad_tracks.append(name)
+
+    for name, (badness, _) in before.bad_tracks.items():
+        if badness < min_badness:
+            continue
+        after_badness = after.bad_tracks.get(name, (0.0, 0))[0]
+        if after_badness < min_badness:
+            diff.fixed_bad_tracks.append(name)
+
+    diff.new_duplicates = sorted(
+        pair for pair in after.duplicates if pair not in before.duplicates
+    )
+    diff.fixed_duplicates = sorted(
+        pair for pair in before.duplicates if pair not in after.duplicates
+    )
+
+    diff.new_bad_tracks.sort(key=lambda name: after.bad_tracks[name][0], reverse=True)
+    diff.worsened_bad_tracks.sort(
+        key=lambda name: after.bad_tracks[name][0], reverse=True
+    )
+    diff.fixed_bad_tracks.sort(
+        key=lambda name: before.bad_tracks[name][0], reverse=True
+    )
+
+    return diff
+
+
+def format_diff(before: Snapshot, after: Snapshot, diff: SnapshotDiff) -> List[str]:
+    lines: List[str] = []
+
+    for name in diff.new_bad_tracks:
+        badness, frame = after.bad_tracks[name]
+        lines.append(f"New bad track: {name} {badness:.1f} at frame {frame}")
+    for name in diff.worsened_bad_tracks:
+        badness, frame = after.bad_tracks[name]
+        before_badness = before.bad_tracks[name][0]
+        lines.append(
+            f"Worse track: {name} {before_badness:.1f} -> {badness:.1f}"
+            f" at frame {frame}"
+        )
+    for name in diff.fixed_bad_tracks:
+        before_badness, frame = before.bad_tracks[name]
+        after_score = after.bad_tracks.get(name)
+        if after_score is None:
+            lines.append(f"Gone bad track: {name} {before_badness:.1f}")
+        else:
+            lines.append(
+                f"Fixed track: {name} {before_badness:.1f} -> {after_score[0]:.1f}"
+            )
+    for track1_name, track2_name in diff.new_duplicates:
+        frame = after.duplicates[(track1_name, track2_name)]
+        lines.append(
+            f"New duplicates: {track1_name} and {track2_name} at frame {frame}"
+        )
+    for track1_name, track2_name in diff.fixed_duplicates:
+        lines.append(f"Fixed duplicates: {track1_name} and {track2_name}")
+
+    return lines
+
+
+def find_snapshot_pairs(
+    before: str, after: str
+) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    (name, before path, after path) of the snapshots to compare.
+
+    For two directories, that's all snapshot file names present in either, with
+    None for the side a snapshot is missing from. For a file and a directory,
+    the file is compared to the snapshot with the same name in the directory.
+    """
+    if os.path.isdir(before) and os.path.isdir(after):
+        before_names = {name for name in os.listdir(before) if name.endswith(".json")}
+        after_names = {name for name in os.listdir(after) if name.endswith(".json")}
+        return [
+            (
+                name,
+                os.path.join(before, name) if name in before_names else None,
+                os.path.join(after, name) if name in after_names else None,
+            )
+            for name in sorted(before_names | after_names)
+        ]
+
+    if os.path.isdir(before):
+        name = os.path.basename(after)
+        return [(name, os.path.join(before, name), after)]
+
+    if os.path.isdir(after):
+        name = os.path.basename(before)
+        return [(name, before, os.path.join(after, name))]
+
+    return [(after, before, after)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Exits with 1 if anything got worse, so that batch jobs can flag the shot.
+
+    Exits with 2 if any snapshot couldn't be compared, because it was missing
+    on one side or couldn't be read. The other snapshots are still compared.
+    """
+    parser = argparse.ArgumentParser(
+        description="Report which tracks got better or worse between two snapshots"
+    )
+    parser.add_argument("before", help="Snapshot file or directory of snapshots")
+    parser.add_argument("after", help="Snapshot file or directory of snapshots")
+    parser.add_argument("--min-badness", type=float, default=MIN_BADNESS)
+    args = parser.parse_args(argv)
+
+    regressions = False
+    errors = False
+    for name, before_path, after_path in find_snapshot_pairs(args.before, args.after):
+        if before_path is None:
+            print(f"{name}: Only in {args.after}", file=sys.stderr)
+            errors = True
+            continue
+        if after_path is None:
+            print(f"{name}: Only in {args.before}", file=sys.stderr)
+            errors = True
+            continue
+
+        try:
+            before = load_snapshot(before_path)
+            after = load_snapshot(after_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"{name}: Can't read snapshot: {e}", file=sys.stderr)
+            errors = True
+            continue
+
+        diff = diff_snapshots(before, after, args.min_badness)
+        regressions = regressions or diff.has_regressions()
+
+        for line in format_diff(before, after, diff):
+            print(f"{name}: {line}")
+
+    if errors:
+        return 2
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,24 +17,54 @@
 
 import bpy
 import time
+import fnmatch
 import operator
 
-from typing import cast, List, Optional, Tuple
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    cast,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from bpy.types import (
     AnyType,
     bpy_prop_collection,
     Context,
     MovieTrackingMarker,
+    MovieTrackingObject,
+    MovieTrackingPlaneTrack,
     MovieTrackingTrack,
     UILayout,
 )
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+
+from .constants import PERCENTILE, DUP_MAXDIST_PERCENT, DUP_MAXDIST_PERCENT_LIMIT
 
-from .find_bad_tracks import find_bad_tracks
-from .find_duplicate_tracks import find_duplicate_tracks
+if TYPE_CHECKING:
+    # The analysis engines get imported on first use, see
+    # OP_Tracking_find_bad_tracks.execute()
+    from .find_bad_tracks import TrackScores
+    from .find_duplicate_tracks import Duplicate
+    from .snapshots import Snapshot
 
 FIND_BAD_TRACKS = "Find Bad Tracks"
 
+# Clip names to the track pairs of their most recent duplicates scan, sorted for
+# display. Used for changing the duplicate threshold without rescanning.
+duplicate_candidates: Dict[str, List["Duplicate"]] = {}
+
+# Clip names to the results of their most recent bad tracks analysis. Used for
+# changing the percentile without rescanning.
+track_scores: Dict[str, "TrackScores"] = {}
+
 
 class BadnessItem(bpy.types.PropertyGroup):
     # FIXME: How do we make all of these read-only in the UI?
@@ -83,7 +113,128 @@ class DuplicateItem(bpy.types.PropertyGroup):
     )
 
 
+# (clip name, list property name) to lowercase row names and alphabetical sort
+# order of that list. Computed on the first redraw after the list is filled, and
+# reused until it's filled again.
+list_name_caches: Dict[Tuple[str, str], Tuple[List[str], List[int]]] = {}
+
+
+def get_list_names(
+    data: Any, propname: str, get_name: Callable[[Any], str]
+) -> Tuple[List[str], List[int]]:
+    items = getattr(data, propname)
+    key = (data.name, propname)
+    cached = list_name_caches.get(key)
+    if cached is not None and len(cached[0]) == len(items):
+        return cached
+
+    names = [get_name(item).lower() for item in items]
+
+    # For each item, its position in alphabetical order
+    alpha_order = [0] * len(names)
+    for position, index in enumerate(sorted(range(len(names)), key=names.__getitem__)):
+        alpha_order[index] = position
+
+    list_name_caches[key] = (names, alpha_order)
+    return names, alpha_order
+
+
+def filter_result_items(
+    ui_list: bpy.types.UIList,
+    data: Any,
+    propname: str,
+    get_name: Callable[[Any], str],
+    min_badness: float,
+    frame_window: Optional[Tuple[int, int]],
+) -> Tuple[List[int], List[int]]:
+    """
+    Shared filter_items() implementation for our result lists.
+
+    Names come from a cache, and numbers are read with foreach_get() rather than
+    one item at a time.
+    """
+    items = getattr(data, propname)
+    count = len(items)
+
+    new_order: List[int] = []
+    names: List[str] = []
+    if ui_list.filter_name or ui_list.use_filter_sort_alpha:
+        # Refilling the lists clears the names cache, so only build it when
+        # it's needed
+        names, alpha_order = get_list_names(data, propname, get_name)
+        if ui_list.use_filter_sort_alpha:
+            new_order = alpha_order
+
+    if not ui_list.filter_name and min_badness <= 0 and frame_window is None:
+        # Nothing filtered out
+        return [], new_order
+
+    visible = ui_list.bitflag_filter_item
+    flags = [visible] * count
+
+    if ui_list.filter_name:
+        # Match Blender's own list filtering, case-insensitive and substring
+        # matching unless there are wildcards
+        pattern = ui_list.filter_name.lower()
+        if not any(wildcard in pattern for wildcard in "*?["):
+            pattern = f"*{pattern}*"
+        for index, name in enumerate(names):
+            if not fnmatch.fnmatchcase(name, pattern):
+                flags[index] = 0
+
+    if min_badness > 0:
+        badnesses = array("f", bytes(4 * count))
+        items.foreach_get("badness", badnesses)
+        for index, badness in enumerate(badnesses):
+            if badness < min_badness:
+                flags[index] = 0
+
+    if frame_window is not None:
+        first_frame, last_frame = frame_window
+        frames = array("i", bytes(4 * count))
+        items.foreach_get("frame", frames)
+        for index, frame in enumerate(frames):
+            if not first_frame <= frame <= last_frame:
+                flags[index] = 0
+
+    return flags, new_order
+
+
+def draw_frame_window_filter(ui_list: bpy.types.UIList, layout: UILayout) -> None:
+    row = layout.row(align=True)
+    row.prop(ui_list, "use_frame_window", text="")
+    sub = row.row(align=True)
+    sub.active = ui_list.use_frame_window  # type: ignore
+    sub.prop(ui_list, "frame_window_start")
+    sub.prop(ui_list, "frame_window_end")
+
+
 class TRACKING_UL_BadnessItem(bpy.types.UIList):
+    min_badness: bpy.props.FloatProperty(  # type: ignore
+        name="Min Badness",
+        min=0,
+        default=0,
+        description="Hide tracks with lower badness scores than this",
+    )
+
+    use_frame_window: bpy.props.BoolProperty(  # type: ignore
+        name="Frame Window",
+        default=False,
+        description="Only show tracks with their worst frame in this range",
+    )
+
+    frame_window_start: bpy.props.IntProperty(  # type: ignore
+        name="Start",
+        default=1,
+        description="First frame of the frame window",
+    )
+
+    frame_window_end: bpy.props.IntProperty(  # type: ignore
+        name="End",
+        default=250,
+        description="Last frame of the frame window",
+    )
+
     def draw_item(
         self,
         context: Context | None,
@@ -109,8 +260,48 @@ class TRACKING_UL_BadnessItem(bpy.types.UIList):
         badness = badnessItem.badness
         layout.label(text=f"{badness:.1f}")
 
+    def draw_filter(self, context: Context | None, layout: UILayout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon="ARROW_LEFTRIGHT")
+        layout.prop(self, "min_badness")
+        draw_frame_window_filter(self, layout)
+        layout.prop(self, "use_filter_sort_alpha")
+
+    def filter_items(self, context: Context | None, data: AnyType | None, property):
+        frame_window: Optional[Tuple[int, int]] = None
+        if self.use_frame_window:
+            frame_window = (self.frame_window_start, self.frame_window_end)
+
+        return filter_result_items(
+            self,
+            data,
+            property,
+            lambda item: item.track,
+            self.min_badness,
+            frame_window,
+        )
+
 
 class TRACKING_UL_DuplicateItem(bpy.types.UIList):
+    use_frame_window: bpy.props.BoolProperty(  # type: ignore
+        name="Frame Window",
+        default=False,
+        description="Only show track pairs overlapping in this range",
+    )
+
+    frame_window_start: bpy.props.IntProperty(  # type: ignore
+        name="Start",
+        default=1,
+        description="First frame of the frame window",
+    )
+
+    frame_window_end: bpy.props.IntProperty(  # type: ignore
+        name="End",
+        default=250,
+        description="Last frame of the frame window",
+    )
+
     def draw_item(
         self,
         context: Context | None,
@@ -127,7 +318,27 @@ class TRACKING_UL_DuplicateItem(bpy.types.UIList):
             return
 
         duplicateItem = cast(DuplicateItem, item)
-        layout.label(text=f"{duplicateItem.track1_name} & {duplicateItem.track2_name}")
+        layout.label(text=duplicate_item_name(duplicateItem))
+
+    def draw_filter(self, context: Context | None, layout: UILayout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon="ARROW_LEFTRIGHT")
+        draw_frame_window_filter(self, layout)
+        layout.prop(self, "use_filter_sort_alpha")
+
+    def filter_items(self, context: Context | None, data: AnyType | None, property):
+        frame_window: Optional[Tuple[int, int]] = None
+        if self.use_frame_window:
+            frame_window = (self.frame_window_start, self.frame_window_end)
+
+        return filter_result_items(
+            self, data, property, duplicate_item_name, 0, frame_window
+        )
+
+
+def duplicate_item_name(item: DuplicateItem) -> str:
+    return f"{item.track1_name} & {item.track2_name}"
 
 
 def get_active_clip(context: bpy.types.Context):
@@ -158,41 +369,402 @@ class OP_Tracking_find_bad_tracks(bpy.types.Operator):
         return get_active_clip(context) is not None
 
     def execute(self, context: bpy.types.Context):
+        # Import the analysis engines on first use rather than when the add-on
+        # is registered, to not slow down Blender startup
+        from . import memory_profiler
+        from .find_bad_tracks import analyze_tracks
+        from .find_duplicate_tracks import find_duplicate_tracks, Duplicate
+        from .memory_profiler import MemoryProfiler
+
         clip = get_active_clip(context)
+        profiler = MemoryProfiler(memory_profiler.is_enabled())
+        neighbour_count: int = clip.neighbour_count
 
         t0 = time.time()
-
-        badnesses = find_bad_tracks(clip)
-
-        bad_tracks_prop = context.edit_movieclip.bad_tracks  # type: ignore
-        bad_tracks_prop.clear()
-        for track_name, badness in sorted(
-            badnesses.items(), key=lambda item: item[1].amount, reverse=True
-        ):
-            new_property = bad_tracks_prop.add()
-            new_property.track = track_name
-            new_property.badness = badness.amount
-            new_property.frame = badness.frame
-
+        with profiler.stage("find_bad_tracks"):
+            scores = analyze_tracks(clip, neighbour_count=neighbour_count)
         t1 = time.time()
         print(f"Finding bad tracks took {t1 - t0:.2f}s")
 
         t0 = time.time()
+        with profiler.stage("find_duplicate_tracks"):
+            dups = list(
+                find_duplicate_tracks(clip, maxdist2=Duplicate.dup_maxdist_limit2)
+            )
+        t1 = time.time()
+        print(f"Finding duplicate tracks took {t1 - t0:.2f}s")
 
-        dups = find_duplicate_tracks(clip)
+        with profiler.stage("Filling in results"):
+            fill_bad_tracks(context, scores)
+            fill_duplicate_tracks(context, dups)
 
-        duplicate_tracks_prop = context.edit_movieclip.duplicate_tracks  # type: ignore
-        duplicate_tracks_prop.clear()
+        if profiler.enabled:
+            print(profiler.report())
+
+        return {"FINISHED"}
 
-        for dup in sorted(dups, key=operator.attrgetter("maxdist2"), reverse=True):
-            new_property = duplicate_tracks_prop.add()
-            new_property.track1_name = dup.track1_name
-            new_property.track2_name = dup.track2_name
-            new_property.frame = dup.most_interesting_frame()
+
+def fill_bad_tracks(context: bpy.types.Context, scores: "TrackScores"):
+    clip = context.edit_movieclip
+    track_scores[clip.name] = scores
+    refill_bad_tracks(clip)
+
+
+def refill_bad_tracks(clip: bpy.types.MovieClip) -> None:
+    """
+    Fill in the bad tracks list from the most recent analysis of this clip,
+    scored at the clip's current percentile.
+    """
+    scores = track_scores.get(clip.name)
+    bad_tracks_prop = clip.bad_tracks  # type: ignore
+    bad_tracks_prop.clear()
+    list_name_caches.pop((clip.name, "bad_tracks"), None)
+    if scores is None:
+        return
+
+    badnesses = scores.score(clip.percentile)  # type: ignore
+    for track_name, badness in sorted(
+        badnesses.items(), key=lambda item: item[1].amount, reverse=True
+    ):
+        new_property = bad_tracks_prop.add()
+        new_property.track = track_name
+        new_property.badness = badness.amount
+        new_property.frame = badness.frame
+
+
+def fill_duplicate_tracks(context: bpy.types.Context, dups: Iterable["Duplicate"]):
+    """
+    dups should contain all pairs within DUP_MAXDIST_PERCENT_LIMIT, so that the
+    duplicate threshold can be changed later without rescanning.
+    """
+    clip = context.edit_movieclip
+    duplicate_candidates[clip.name] = sorted(
+        dups, key=operator.attrgetter("maxdist2"), reverse=True
+    )
+    refill_duplicate_tracks(clip)
+
+
+def refill_duplicate_tracks(clip: bpy.types.MovieClip) -> None:
+    """
+    Fill in the duplicate tracks list from the most recent scan of this clip,
+    using the clip's current duplicate threshold.
+    """
+    threshold_fraction = clip.duplicate_threshold / 100.0  # type: ignore
+    maxdist2 = threshold_fraction * threshold_fraction
+
+    duplicate_tracks_prop = clip.duplicate_tracks  # type: ignore
+    duplicate_tracks_prop.clear()
+    list_name_caches.pop((clip.name, "duplicate_tracks"), None)
+    for dup in duplicate_candidates.get(clip.name, []):
+        if not dup.are_dups(maxdist2):
+            continue
+        new_property = duplicate_tracks_prop.add()
+        new_property.track1_name = dup.track1_name
+        new_property.track2_name = dup.track2_name
+        new_property.frame = dup.most_interesting_frame(maxdist2)
+
+
+class OP_Tracking_act_on_bad_tracks(bpy.types.Operator):
+    """
+    Do the same thing to all bad tracks above a badness threshold, or to the
+    shorter track of each duplicate tracks pair.
+    """
+
+    bl_idname = "tracking.act_on_bad_tracks"
+    bl_label = "Act on Results"
+    bl_options = {"REGISTER", "UNDO"}
+
+    source: bpy.props.EnumProperty(  # type: ignore
+        name="Tracks",
+        items=(
+            ("BAD_TRACKS", "Bad Tracks", "Bad tracks above the badness threshold"),
+            ("DUPLICATES", "Duplicates", "The shorter track of each duplicate pair"),
+        ),
+        default="BAD_TRACKS",
+    )
+
+    action: bpy.props.EnumProperty(  # type: ignore
+        name="Action",
+        items=(
+            ("SELECT", "Select", "Select these tracks and no others"),
+            ("HIDE", "Hide", "Hide these tracks"),
+            ("MUTE", "Mute", "Mute the marker in the bad or overlapping frame"),
+            ("COLOR", "Color", "Give these tracks a custom color"),
+            ("DELETE", "Delete", "Delete these tracks"),
+        ),
+        default="SELECT",
+    )
+
+    min_badness: bpy.props.FloatProperty(  # type: ignore
+        name="Min Badness",
+        min=0,
+        default=2.0,
+        description="Act on bad tracks with at least this badness score",
+    )
+
+    color: bpy.props.FloatVectorProperty(  # type: ignore
+        name="Color",
+        subtype="COLOR",
+        size=3,
+        min=0,
+        max=1,
+        default=(1.0, 0.0, 0.0),
+    )
+
+    @classmethod
+    def poll(cls, context):
+        if context.edit_movieclip is None:
+            return False
+        return get_active_clip(context) is not None
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "action")
+        if self.source == "BAD_TRACKS":
+            layout.prop(self, "min_badness")
+        if self.action == "COLOR":
+            layout.prop(self, "color")
+
+    def execute(self, context: bpy.types.Context):
+        t0 = time.time()
+        clip = get_active_clip(context)
+
+        tracks_by_name = {
+            track.name: track
+            for track in cast(List[MovieTrackingTrack], clip.tracking.tracks)
+        }
+
+        # Track names to the frame to mute for that track
+        targets: Dict[str, int]
+        if self.source == "BAD_TRACKS":
+            targets = get_bad_track_targets(clip, self.min_badness)
+        else:
+            targets = get_duplicate_track_targets(clip, tracks_by_name)
+
+        if self.action == "SELECT":
+            for name, track in tracks_by_name.items():
+                track.select = name in targets
+        elif self.action == "DELETE":
+            # delete_track() deletes everything selected in the active tracking
+            # object, plane tracks included, and skips hidden tracks. Our
+            # tracks are the camera object's.
+            tracking_objects = cast(List[MovieTrackingObject], clip.tracking.objects)
+            for tracking_object in tracking_objects:
+                plane_tracks = cast(
+                    List[MovieTrackingPlaneTrack], tracking_object.plane_tracks
+                )
+                for plane_track in plane_tracks:
+                    plane_track.select = False
+                if not tracking_object.is_camera:
+                    object_tracks = cast(
+                        List[MovieTrackingTrack], tracking_object.tracks
+                    )
+                    for track in object_tracks:
+                        track.select = False
+            for name, track in tracks_by_name.items():
+                if name in targets:
+                    track.hide = False
+                track.select = name in targets
+
+            active_object = clip.tracking.objects.active
+            clip.tracking.objects.active = next(
+                tracking_object
+                for tracking_object in tracking_objects
+                if tracking_object.is_camera
+            )
+            try:
+                bpy.ops.clip.delete_track(confirm=False)
+            finally:
+                clip.tracking.objects.active = active_object
+
+            # Only forget about the tracks that actually got deleted
+            remaining = {
+                track.name
+                for track in cast(List[MovieTrackingTrack], clip.tracking.tracks)
+            }
+            forget_tracks(clip, set(targets) - remaining)
+        else:
+            for name, frame in targets.items():
+                target_track = tracks_by_name.get(name)
+                if target_track is None:
+                    continue
+                if self.action == "HIDE":
+                    target_track.hide = True
+                elif self.action == "MUTE":
+                    marker = target_track.markers.find_frame(frame)
+                    if marker is not None:
+                        marker.mute = True
+                elif self.action == "COLOR":
+                    target_track.use_custom_color = True
+                    target_track.color = self.color
 
         t1 = time.time()
-        print(f"Finding duplicate tracks took {t1 - t0:.2f}s")
+        print(f"Acting on {len(targets)} tracks took {t1 - t0:.2f}s")
+        self.report({"INFO"}, f"{self.action.capitalize()}: {len(targets)} tracks")
+
+        return {"FINISHED"}
+
+
+def get_bad_track_targets(
+    clip: bpy.types.MovieClip, min_badness: float
+) -> Dict[str, int]:
+    """
+    Names and worst frames of all bad tracks with at least this badness.
+    """
+    targets: Dict[str, int] = {}
+
+    # The list is sorted by badness, worst first
+    for item in clip.bad_tracks:  # type: ignore
+        if item.badness < min_badness:
+            break
+        targets[item.track] = item.frame
+
+    return targets
+
+
+def get_duplicate_track_targets(
+    clip: bpy.types.MovieClip, tracks_by_name: Dict[str, MovieTrackingTrack]
+) -> Dict[str, int]:
+    """
+    Names and first overlapping frames of the shorter track of each duplicates
+    pair.
+    """
+    targets: Dict[str, int] = {}
+
+    # Track names to track lengths, since tracks are often in multiple pairs
+    lengths: Dict[str, int] = {}
+
+    for item in clip.duplicate_tracks:  # type: ignore
+        track1 = tracks_by_name.get(item.track1_name)
+        track2 = tracks_by_name.get(item.track2_name)
+        if track1 is None or track2 is None:
+            continue
+
+        for track in (track1, track2):
+            if track.name not in lengths:
+                first, last = get_first_last_frames(track)
+                lengths[track.name] = last - first
+
+        # Same choice as get_front_track()
+        shorter = track1
+        if lengths[track2.name] < lengths[track1.name]:
+            shorter = track2
+        targets.setdefault(shorter.name, item.frame)
+
+    return targets
+
+
+def forget_tracks(clip: bpy.types.MovieClip, names: Set[str]) -> None:
+    """
+    Remove these tracks from our cached results and the result lists.
+    """
+    scores = track_scores.get(clip.name)
+    if scores is not None:
+        scores.exclude_tracks(names)
+
+    candidates = duplicate_candidates.get(clip.name)
+    if candidates is not None:
+        duplicate_candidates[clip.name] = [
+            dup
+            for dup in candidates
+            if dup.track1_name not in names and dup.track2_name not in names
+        ]
+
+    refill_bad_tracks(clip)
+    refill_duplicate_tracks(clip)
+
+
+def get_results_snapshot(clip: bpy.types.MovieClip) -> "Snapshot":
+    """
+    What the result lists currently show.
+    """
+    from .snapshots import Snapshot, pair_key
+
+    snapshot = Snapshot()
+    for item in clip.bad_tracks:  # type: ignore
+        snapshot.bad_tracks[item.track] = (item.badness, item.frame)
+    for item in clip.duplicate_tracks:  # type: ignore
+        snapshot.duplicates[pair_key(item.track1_name, item.track2_name)] = item.frame
+    return snapshot
+
+
+class OP_Tracking_save_results_snapshot(bpy.types.Operator, ExportHelper):
+    """
+    Save the current bad and duplicate tracks to a file, to compare later
+    results to.
+    """
+
+    bl_idname = "tracking.save_results_snapshot"
+    bl_label = "Save Snapshot"
+
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(  # type: ignore
+        default="*.json",
+        options={"HIDDEN"},
+    )
+
+    @classmethod
+    def poll(cls, context):
+        if context.edit_movieclip is None:
+            return False
+        return get_active_clip(context) is not None
+
+    def execute(self, context: bpy.types.Context):
+        from .snapshots import save_snapshot
+
+        filepath: str = self.filepath  # type: ignore
+        snapshot = get_results_snapshot(get_active_clip(context))
+        save_snapshot(snapshot, filepath)
+        self.report({"INFO"}, f"Saved {filepath}")
+        return {"FINISHED"}
+
+
+class OP_Tracking_compare_results_snapshot(bpy.types.Operator, ImportHelper):
+    """
+    Report which tracks got better or worse since a saved snapshot. The full
+    report is printed on the console.
+    """
+
+    bl_idname = "tracking.compare_results_snapshot"
+    bl_label = "Compare to Snapshot"
+
+    filter_glob: bpy.props.StringProperty(  # type: ignore
+        default="*.json",
+        options={"HIDDEN"},
+    )
 
+    @classmethod
+    def poll(cls, context):
+        if context.edit_movieclip is None:
+            return False
+        return get_active_clip(context) is not None
+
+    def execute(self, context: bpy.types.Context):
+        from .snapshots import diff_snapshots, format_diff, load_snapshot
+
+        filepath: str = self.filepath  # type: ignore
+        try:
+            before = load_snapshot(filepath)
+        except (OSError, ValueError, KeyError) as e:
+            self.report({"ERROR"}, f"Can't read snapshot {filepath}: {e}")
+            return {"CANCELLED"}
+        after = get_results_snapshot(get_active_clip(context))
+        diff = diff_snapshots(before, after)
+        for line in format_diff(before, after, diff):
+            print(line)
+
+        summary = (
+            f"{len(diff.new_bad_tracks)} new,"
+            f" {len(diff.worsened_bad_tracks)} worse,"
+            f" {len(diff.fixed_bad_tracks)} fixed bad tracks;"
+            f" {len(diff.new_duplicates)} new,"
+            f" {len(diff.fixed_duplicates)} fixed duplicates"
+        )
+        self.report({"WARNING"} if diff.has_regressions() else {"INFO"}, summary)
         return {"FINISHED"}
 
 
@@ -217,10 +789,15 @@ class TRACKING_PT_FindBadTracksPanel(bpy.types.Panel):
         col = layout.column()
         row = col.row()
         row.operator("tracking.find_bad_tracks")
+        col.row().prop(context.edit_movieclip, "neighbour_count")
+        row = col.row()
+        row.operator("tracking.save_results_snapshot")
+        row.operator("tracking.compare_results_snapshot")
 
         # Draw the bad-tracks list
         box = col.box()
         box.row().label(text="Bad Tracks")
+        box.row().prop(context.edit_movieclip, "percentile", slider=True)
         box.row().template_list(
             listtype_name="TRACKING_UL_BadnessItem",
             list_id="",
@@ -230,10 +807,13 @@ class TRACKING_PT_FindBadTracksPanel(bpy.types.Panel):
             active_propname="active_bad_track",
             sort_lock=True,
         )
+        props = box.row().operator("tracking.act_on_bad_tracks")
+        props.source = "BAD_TRACKS"
 
         # Draw a duplicate-tracks list
         box = col.box()
         box.row().label(text="Duplicate Tracks")
+        box.row().prop(context.edit_movieclip, "duplicate_threshold", slider=True)
         box.row().template_list(
             listtype_name="TRACKING_UL_DuplicateItem",
             list_id="",
@@ -243,10 +823,15 @@ class TRACKING_PT_FindBadTracksPanel(bpy.types.Panel):
             active_propname="active_duplicate_tracks",
             sort_lock=True,
         )
+        props = box.row().operator("tracking.act_on_bad_tracks")
+        props.source = "DUPLICATES"
 
 
 classes = (
     OP_Tracking_find_bad_tracks,
+    OP_Tracking_act_on_bad_tracks,
+    OP_Tracking_save_results_snapshot,
+    OP_Tracking_compare_results_snapshot,
     TRACKING_PT_FindBadTracksPanel,
     TRACKING_UL_BadnessItem,
     TRACKING_UL_DuplicateItem,
@@ -294,6 +879,22 @@ def on_switch_active_bad_track(
     context.scene.frame_set(badness_item.frame)
 
 
+def on_change_percentile(_: bpy.types.IntProperty, context: bpy.types.Context) -> None:
+    if context.edit_movieclip is None:  # type: ignore
+        return
+
+    refill_bad_tracks(context.edit_movieclip)
+
+
+def on_change_duplicate_threshold(
+    _: bpy.types.FloatProperty, context: bpy.types.Context
+) -> None:
+    if context.edit_movieclip is None:  # type: ignore
+        return
+
+    refill_duplicate_tracks(context.edit_movieclip)
+
+
 def get_first_last_frames(track: MovieTrackingTrack) -> Tuple[int, int]:
     markers_collection = cast(bpy_prop_collection, track.markers)
     first: Optional[int] = None
@@ -402,6 +1003,25 @@ def register():
         update=on_switch_active_bad_track,
     )
 
+    bpy.types.MovieClip.neighbour_count = bpy.props.IntProperty(  # pyright: ignore [reportAttributeAccessIssue]
+        name="Neighbours",
+        description="Compare each track to this many of its nearest neighbours rather than to all tracks, 0 compares to all tracks",
+        default=0,
+        min=0,
+        max=100,
+        options={"SKIP_SAVE"},
+    )
+
+    bpy.types.MovieClip.percentile = bpy.props.IntProperty(  # pyright: ignore [reportAttributeAccessIssue]
+        name="Percentile",
+        description="Movements within this percentile get a badness score of at most 1",
+        default=PERCENTILE,
+        min=1,
+        max=99,
+        options={"SKIP_SAVE"},
+        update=on_change_percentile,
+    )
+
     bpy.types.MovieClip.duplicate_tracks = bpy.props.CollectionProperty(  # pyright: ignore [reportAttributeAccessIssue]
         type=DuplicateItem,
         name="Duplicate Tracks",
@@ -417,6 +1037,17 @@ def register():
         update=on_switch_active_duplicate_tracks,
     )
 
+    bpy.types.MovieClip.duplicate_threshold = bpy.props.FloatProperty(  # pyright: ignore [reportAttributeAccessIssue]
+        name="Max Distance %",
+        description="Tracks closer than this many percent of the image size are duplicates",
+        default=DUP_MAXDIST_PERCENT,
+        min=0.01,
+        max=DUP_MAXDIST_PERCENT_LIMIT,
+        precision=2,
+        options={"SKIP_SAVE"},
+        update=on_change_duplicate_threshold,
+    )
+
 
 def unregister():
     for cls in classes:
@@ -425,5 +1056,12 @@ def unregister():
     # Clear properties.
     del bpy.types.MovieClip.bad_tracks  # pyright: ignore [reportAttributeAccessIssue]
     del bpy.types.MovieClip.active_bad_track  # pyright: ignore [reportAttributeAccessIssue]
+    del bpy.types.MovieClip.neighbour_count  # pyright: ignore [reportAttributeAccessIssue]
+    del bpy.types.MovieClip.percentile  # pyright: ignore [reportAttributeAccessIssue]
     del bpy.types.MovieClip.duplicate_tracks  # pyright: ignore [reportAttributeAccessIssue]
     del bpy.types.MovieClip.active_duplicate_tracks  # pyright: ignore [reportAttributeAccessIssue]
+    del bpy.types.MovieClip.duplicate_threshold  # pyright: ignore [reportAttributeAccessIssue]
+
+    duplicate_candidates.clear()
+    track_scores.clear()
+    list_name_caches.clear()
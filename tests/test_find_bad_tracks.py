@@ -1,4 +1,6 @@
-from typing import cast, List, Tuple, Optional, Union, Any
+import random
+import statistics
+from typing import cast, Dict, List, Set, Tuple, Optional, Union, Any
 
 from bpy.types import (
     MovieClip,
@@ -10,11 +12,14 @@ from bpy.types import (
 )
 
 from find_bad_motion_tracks.find_bad_tracks import (
+    RollingWindow,
+    analyze_tracks,
     find_bad_tracks,
     shape_change_amount,
     Badness,
-    BadnessCalculator,
-    TrackWithFloat,
+    FrameDeviations,
+    compute_badness,
+    get_percentile_radius,
 )
 
 
@@ -24,6 +29,21 @@ class FakeMovieTrackingMarkers(MovieTrackingMarkers):
 
         self.coordinates = coordinates
 
+        # Frames whose markers are muted, like after a track was lost
+        self.muted_frames: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.coordinates)
+
+    def foreach_get(self, attr: str, seq: Any) -> None:
+        for frame in range(len(self.coordinates)):
+            if attr == "frame":
+                seq[frame] = frame
+            elif attr == "mute":
+                seq[frame] = frame in self.muted_frames
+            else:
+                raise NotImplementedError(attr)
+
     def find_frame(
         self, frame: Optional[int], exact: Optional[Union[bool, Any]] = True
     ) -> "MovieTrackingMarker":
@@ -33,6 +53,7 @@ class FakeMovieTrackingMarkers(MovieTrackingMarkers):
             return marker
 
         marker.co = self.coordinates[frame]
+        marker.mute = frame in self.muted_frames
 
         # Badness code expects markers to come with four corners. Corners are
         # relative to the marker position, so we give all markers the same
@@ -108,20 +129,22 @@ def test_find_bad_tracks_with_shape_change() -> None:
 
 
 def test_compute_badness_score() -> None:
-    movingRight = TrackWithFloat(MovieTrackingTrack(), 10.0, 1)
-    movingLeft = TrackWithFloat(MovieTrackingTrack(), -10.0, 1)
+    movingRight = 10.0
+    movingLeft = -10.0
 
-    movements: List[TrackWithFloat] = [
+    movements: List[float] = [
         movingRight,
         movingRight,
         movingRight,
         movingLeft,
     ]
 
-    badness_calculator = BadnessCalculator(movements)
+    frame_deviations = FrameDeviations(1, range(len(movements)), movements)
+    percentile_radius = get_percentile_radius(frame_deviations.sorted_deviations)
 
-    leftScore = badness_calculator.compute_badness_score(movingLeft)
-    rightScore = badness_calculator.compute_badness_score(movingRight)
+    # Track 3 is moving left, the others are moving right
+    leftScore = compute_badness(frame_deviations.deviations[3], percentile_radius)
+    rightScore = compute_badness(frame_deviations.deviations[0], percentile_radius)
 
     assert leftScore > rightScore
     assert leftScore > 0
@@ -139,3 +162,164 @@ def test_compute_shape_change_amount():
     # The exact value here doesn't matter, but it needs to be noticeably bigger
     # than with no marker change
     assert shape_change_amount(previous_marker, marker) == 5.0
+
+
+def test_unchanged_shape_blames_first_frame() -> None:
+    clip = make_clip()
+    clip.frame_duration = 4
+    for track in clip.tracking.tracks:
+        markers = track.markers
+        assert isinstance(markers, FakeMovieTrackingMarkers)
+        x, y = markers.coordinates[-1]
+        markers.coordinates += [(x + 10.0, y), (x + 20.0, y)]
+
+    shape_badnesses = analyze_tracks(clip).fixed_badnesses[0]
+    assert shape_badnesses["Track 0"] == Badness(0.0, 1)
+
+
+def test_rescore_at_other_percentile() -> None:
+    clip = make_clip()
+    cast(FakeMovieTrackingMarkers, clip.tracking.tracks[0].markers).coordinates[1] = (
+        -100.0,
+        -100.0,
+    )
+
+    scores = analyze_tracks(clip)
+    assert scores.score() == find_bad_tracks(clip)
+
+    for percentile in range(1, 100):
+        rescored = scores.score(percentile)
+        assert max(rescored, key=lambda track: rescored[track].amount) == "Track 0"
+
+
+def test_find_bad_tracks_neighbours() -> None:
+    """
+    Eight background tracks on the left move right, four foreground tracks on
+    the right move left. One of the background tracks moves a bit too far.
+    """
+    movieTrackingTracks: List[MovieTrackingTrack] = []
+    for i in range(12):
+        movieTrackingTrack = MovieTrackingTrack()
+        movieTrackingTrack.name = f"Track {i:02}"
+
+        if i < 8:
+            start = (0.1 + (i % 4) * 0.05, 0.1 + (i // 4) * 0.05)
+            step = 0.012 if i == 5 else 0.01
+        else:
+            start = (0.8 + (i % 2) * 0.05, 0.8 + (i // 10) * 0.05)
+            step = -0.01
+        track = [(start[0] + frame * step, start[1]) for frame in range(2)]
+        movieTrackingTrack.markers = FakeMovieTrackingMarkers(track)
+
+        movieTrackingTracks.append(movieTrackingTrack)
+
+    clip = MovieClip()
+    clip.frame_start = 0
+    clip.frame_duration = 2
+    clip.tracking = MovieTracking()
+    clip.tracking.tracks = cast(MovieTrackingTracks, movieTrackingTracks)
+
+    def worst(badnesses: Dict[str, Badness]) -> str:
+        return max(badnesses, key=lambda track: badnesses[track].amount)
+
+    assert worst(find_bad_tracks(clip)) >= "Track 08"
+    assert worst(find_bad_tracks(clip, neighbour_count=3)) == "Track 05"
+
+
+def test_rolling_window() -> None:
+    rng = random.Random(1)
+    numbers = [rng.random() for _ in range(100)]
+
+    window = RollingWindow(7)
+    for index, number in enumerate(numbers):
+        window.add(number)
+        recent = numbers[max(0, index - 6) : index + 1]
+        assert window.sorted_numbers == sorted(recent)
+        assert window.median() == statistics.median(recent)
+
+
+def test_find_bad_tracks_jitter() -> None:
+    """
+    Ten tracks moving smoothly at different speeds. Track 0 jitters slightly
+    in frame 8.
+    """
+    rng = random.Random(1)
+    movieTrackingTracks: List[MovieTrackingTrack] = []
+    for i in range(10):
+        movieTrackingTrack = MovieTrackingTrack()
+        movieTrackingTrack.name = f"Track {i}"
+
+        track = [
+            (frame * 0.01 * (i + 1) + rng.random() * 0.0005, i * 0.1)
+            for frame in range(12)
+        ]
+        if i == 0:
+            track[8] = (track[8][0] + 0.003, track[8][1])
+        movieTrackingTrack.markers = FakeMovieTrackingMarkers(track)
+
+        movieTrackingTracks.append(movieTrackingTrack)
+
+    clip = MovieClip()
+    clip.frame_start = 0
+    clip.frame_duration = 12
+    clip.tracking = MovieTracking()
+    clip.tracking.tracks = cast(MovieTrackingTracks, movieTrackingTracks)
+
+    assert len(analyze_tracks(clip, jitter_window=0).fixed_badnesses) == 1
+
+    # Shape changes, then jitter
+    _, jitter = analyze_tracks(clip).fixed_badnesses
+
+    assert max(jitter, key=lambda track: jitter[track].amount) == "Track 0"
+
+    # Jumping away in frame 8 and back in frame 9 are equally bad
+    assert jitter["Track 0"].frame in (8, 9)
+
+
+def test_find_bad_tracks_jitter_across_gap() -> None:
+    """
+    Track 0 is lost in frame 8, and then picked up again on something moving
+    three times as fast. That's a new start, not jitter.
+    """
+    rng = random.Random(1)
+    movieTrackingTracks: List[MovieTrackingTrack] = []
+    for i in range(10):
+        movieTrackingTrack = MovieTrackingTrack()
+        movieTrackingTrack.name = f"Track {i}"
+
+        speed = 0.01 * (i + 1)
+        track = [
+            (frame * speed + rng.random() * 0.0005, i * 0.1) for frame in range(20)
+        ]
+        if i == 0:
+            track[9:] = [(x * 3, y) for x, y in track[9:]]
+        markers = FakeMovieTrackingMarkers(track)
+        if i == 0:
+            markers.muted_frames.add(8)
+        movieTrackingTrack.markers = markers
+
+        movieTrackingTracks.append(movieTrackingTrack)
+
+    clip = MovieClip()
+    clip.frame_start = 0
+    clip.frame_duration = 20
+    clip.tracking = MovieTracking()
+    clip.tracking.tracks = cast(MovieTrackingTracks, movieTrackingTracks)
+
+    _, jitter = analyze_tracks(clip).fixed_badnesses
+    assert jitter["Track 0"].amount < max(badness.amount for badness in jitter.values())
+
+
+def test_exclude_tracks() -> None:
+    clip = make_clip()
+    cast(FakeMovieTrackingMarkers, clip.tracking.tracks[0].markers).coordinates[0] = (
+        -11.0,
+        -1.0,
+    )
+
+    scores = analyze_tracks(clip)
+    assert "Track 0" in scores.score()
+
+    scores.exclude_tracks({"Track 0"})
+    assert "Track 0" not in scores.score()
+    assert "Track 1" in scores.score()
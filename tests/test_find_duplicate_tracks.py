@@ -0,0 +1,68 @@
+from typing import cast, List
+
+from bpy.types import (
+    MovieClip,
+    MovieTracking,
+    MovieTrackingTrack,
+    MovieTrackingTracks,
+)
+
+from find_bad_motion_tracks.find_duplicate_tracks import (
+    find_duplicate_tracks,
+    Duplicate,
+)
+from tests.test_find_bad_tracks import FakeMovieTrackingMarkers
+
+
+def make_clip() -> MovieClip:
+    """
+    Four tracks over six frames. Track 0 and Track 1 overlap during frames 2-3,
+    are 1% apart in frames 1 and 4 and then drift apart. The others stay away
+    from everything.
+    """
+    coordinates = [
+        [(0.1, 0.1), (0.2, 0.2), (0.3, 0.3), (0.4, 0.4), (0.5, 0.5), (0.6, 0.6)],
+        [(0.9, 0.9), (0.21, 0.2), (0.3, 0.3), (0.4, 0.4), (0.51, 0.5), (0.8, 0.8)],
+        [(0.1, 0.9)] * 6,
+        [(0.9, 0.1)] * 6,
+    ]
+
+    movieTrackingTracks: List[MovieTrackingTrack] = []
+    for i, track in enumerate(coordinates):
+        movieTrackingTrack = MovieTrackingTrack()
+        movieTrackingTrack.name = f"Track {i}"
+        movieTrackingTrack.markers = FakeMovieTrackingMarkers(track)
+        movieTrackingTracks.append(movieTrackingTrack)
+
+    clip = MovieClip()
+    clip.frame_start = 0
+    clip.frame_duration = 6
+    clip.tracking = MovieTracking()
+    clip.tracking.tracks = cast(MovieTrackingTracks, movieTrackingTracks)
+    return clip
+
+
+def test_find_duplicate_tracks() -> None:
+    dups = list(find_duplicate_tracks(make_clip()))
+
+    assert len(dups) == 1
+    dup = dups[0]
+    assert (dup.track1_name, dup.track2_name) == ("Track 0", "Track 1")
+    assert dup.first_overlapping_frame() == 2
+    assert dup.last_overlapping_frame() == 3
+    assert dup.most_interesting_frame() == 3
+
+
+def test_duplicate_threshold() -> None:
+    dups = list(
+        find_duplicate_tracks(make_clip(), maxdist2=Duplicate.dup_maxdist_limit2)
+    )
+    assert len(dups) == 1
+    dup = dups[0]
+
+    # Track 0 and Track 1 are 0.01 apart in frames 1 and 4
+    assert dup.first_overlapping_frame(0.009**2) == 2
+    assert dup.first_overlapping_frame(0.011**2) == 1
+    assert dup.last_overlapping_frame(0.011**2) == 4
+    assert dup.most_interesting_frame(0.011**2) == 4
+    assert dup.most_interesting_frame() == 3
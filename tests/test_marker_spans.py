@@ -0,0 +1,77 @@
+from typing import List
+
+from bpy.types import MovieTrackingTrack
+
+from find_bad_motion_tracks.find_bad_tracks import (
+    WorstBadnesses,
+    generate_frame_movements,
+)
+from find_bad_motion_tracks.marker_spans import get_alive_tracks, get_marker_spans
+from tests.test_find_bad_tracks import FakeMovieTrackingMarkers, make_clip
+
+
+def make_track(frame_count: int, muted_frames: List[int]) -> MovieTrackingTrack:
+    markers = FakeMovieTrackingMarkers([(0.0, 0.0)] * frame_count)
+    markers.muted_frames.update(muted_frames)
+
+    track = MovieTrackingTrack()
+    track.markers = markers
+    return track
+
+
+def test_get_marker_spans() -> None:
+    assert get_marker_spans(make_track(0, [])) == []
+    assert get_marker_spans(make_track(5, [])) == [(0, 4)]
+    assert get_marker_spans(make_track(5, [0, 1, 2, 3, 4])) == []
+    assert get_marker_spans(make_track(10, [0, 3, 4, 9])) == [(1, 2), (5, 8)]
+
+
+def test_get_alive_tracks() -> None:
+    tracks = [
+        make_track(10, [3, 4]),
+        make_track(10, [0, 1, 2, 3, 4, 5]),
+        make_track(4, []),
+    ]
+
+    assert get_alive_tracks(tracks, 0, 9) == [
+        [0, 2],
+        [0, 2],
+        [0, 2],
+        [2],
+        [],
+        [0],
+        [0, 1],
+        [0, 1],
+        [0, 1],
+        [0, 1],
+    ]
+
+    assert get_alive_tracks(tracks, 4, 6) == [[], [0], [0, 1]]
+
+
+def test_generate_frame_movements_across_gap() -> None:
+    clip = make_clip()
+    clip.frame_duration = 4
+    for track in clip.tracking.tracks:
+        markers = track.markers
+        assert isinstance(markers, FakeMovieTrackingMarkers)
+        x, y = markers.coordinates[-1]
+        markers.coordinates += [(x + 10.0, y), (x + 20.0, y)]
+
+    # Lost for a frame and then picked up again far away. The jump is across
+    # the gap and shouldn't count as movement.
+    markers = clip.tracking.tracks[0].markers
+    assert isinstance(markers, FakeMovieTrackingMarkers)
+    markers.muted_frames.add(2)
+    markers.coordinates[3] = (1000.0, 1000.0)
+
+    tracks = list(clip.tracking.tracks)
+    shape_badnesses = WorstBadnesses(len(tracks))
+    d_ids = {}
+    dd_ids = {}
+    for movements in generate_frame_movements(tracks, shape_badnesses, 0, 3):
+        d_ids[movements.frame] = list(movements.d_ids)
+        dd_ids[movements.frame] = list(movements.dd_ids)
+
+    assert d_ids == {1: [0, 1, 2, 3], 2: [1, 2, 3], 3: [1, 2, 3]}
+    assert dd_ids == {1: [], 2: [1, 2, 3], 3: [1, 2, 3]}
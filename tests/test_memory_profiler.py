@@ -0,0 +1,25 @@
+from find_bad_motion_tracks.find_duplicate_tracks import Duplicate
+from find_bad_motion_tracks.memory_profiler import MemoryProfiler
+
+
+def test_memory_profiler() -> None:
+    profiler = MemoryProfiler(True)
+    with profiler.stage("Allocating"):
+        dups = [Duplicate(f"a{i}", f"b{i}", 0, 0.0) for i in range(100)]
+
+    assert len(profiler.stages) == 1
+    stage = profiler.stages[0]
+    assert stage.name == "Allocating"
+    assert stage.peak >= stage.allocated > 0
+    assert stage.live_objects["Duplicate"] >= len(dups)
+    assert stage.top_sites
+    assert "Allocating" in profiler.report()
+
+
+def test_memory_profiler_disabled() -> None:
+    profiler = MemoryProfiler(False)
+    with profiler.stage("Allocating"):
+        pass
+
+    assert profiler.stages == []
+    assert profiler.report() == ""
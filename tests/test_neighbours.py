@@ -0,0 +1,69 @@
+import random
+import time
+
+from find_bad_motion_tracks.neighbours import find_nearest_neighbours
+
+
+def distance2(xs, ys, a, b) -> float:
+    return (xs[a] - xs[b]) ** 2 + (ys[a] - ys[b]) ** 2
+
+
+def test_find_nearest_neighbours() -> None:
+    rng = random.Random(1)
+    for point_count in (1, 2, 5, 50, 300):
+        xs = [rng.random() for _ in range(point_count)]
+        ys = [rng.random() * 0.3 for _ in range(point_count)]
+
+        for count in (1, 3, 8):
+            all_neighbours = find_nearest_neighbours(xs, ys, count)
+            assert len(all_neighbours) == point_count
+
+            for index, neighbours in enumerate(all_neighbours):
+                others = sorted(
+                    distance2(xs, ys, index, other)
+                    for other in range(point_count)
+                    if other != index
+                )
+                assert index not in neighbours
+                assert [
+                    distance2(xs, ys, index, neighbour) for neighbour in neighbours
+                ] == others[:count]
+
+
+def test_find_nearest_neighbours_same_spot() -> None:
+    assert find_nearest_neighbours([0.5] * 4, [0.5] * 4, 2) == [
+        [1, 2],
+        [0, 2],
+        [0, 1],
+        [0, 1],
+    ]
+
+
+def test_find_nearest_neighbours_clustered() -> None:
+    rng = random.Random(2)
+
+    # Most points in a small patch, like auto detected features on a busy
+    # part of the frame, plus a few far away ones
+    xs = [0.5 + rng.random() * 0.03 for _ in range(2000)]
+    ys = [0.5 + rng.random() * 0.03 for _ in range(2000)]
+    for _ in range(20):
+        xs.append(rng.random())
+        ys.append(rng.random())
+
+    t0 = time.perf_counter()
+    all_neighbours = find_nearest_neighbours(xs, ys, 8)
+    t1 = time.perf_counter()
+    print(f"Clustered nearest neighbours took {t1 - t0:.3f}s")
+
+    for index in rng.sample(range(len(xs)), 50) + list(range(2000, 2020)):
+        others = sorted(
+            distance2(xs, ys, index, other)
+            for other in range(len(xs))
+            if other != index
+        )
+        assert [
+            distance2(xs, ys, index, neighbour) for neighbour in all_neighbours[index]
+        ] == others[:8]
+
+    # A uniform grid over the bounding box took seconds here
+    assert t1 - t0 < 1.0
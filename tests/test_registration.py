@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+REGISTER = """
+import sys
+import time
+
+t0 = time.perf_counter()
+import find_bad_motion_tracks
+find_bad_motion_tracks.register()
+t1 = time.perf_counter()
+find_bad_motion_tracks.unregister()
+
+print(f"{t1 - t0:.3f}s")
+print(" ".join(sorted(module for module in sys.modules if module.startswith("find_bad"))))
+"""
+
+
+def test_registration_does_not_import_engines() -> None:
+    output = subprocess.run(
+        [sys.executable, "-c", REGISTER],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.splitlines()
+
+    print(f"Registration took {output[0]}")
+    assert output[1].split() == [
+        "find_bad_motion_tracks",
+        "find_bad_motion_tracks.constants",
+        "find_bad_motion_tracks.ui",
+    ]
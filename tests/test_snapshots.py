@@ -0,0 +1,132 @@
+import os
+import time
+from typing import Tuple
+
+from find_bad_motion_tracks.snapshots import (
+    Snapshot,
+    diff_snapshots,
+    load_snapshot,
+    main,
+    save_snapshot,
+)
+
+
+def make_snapshots() -> Tuple[Snapshot, Snapshot]:
+    before = Snapshot(
+        bad_tracks={
+            "Good": (0.5, 10),
+            "Fixed": (3.0, 11),
+            "Gone": (4.0, 12),
+            "Worse": (2.5, 13),
+            "Same": (5.0, 14),
+            "New": (1.0, 15),
+        },
+        duplicates={("A", "B"): 20, ("C", "D"): 21},
+    )
+    after = Snapshot(
+        bad_tracks={
+            "Good": (0.6, 10),
+            "Fixed": (1.0, 11),
+            "Worse": (6.0, 30),
+            "Same": (5.5, 14),
+            "New": (3.0, 15),
+            "Born": (7.0, 16),
+        },
+        duplicates={("A", "B"): 20, ("E", "F"): 22},
+    )
+    return before, after
+
+
+def test_diff_snapshots() -> None:
+    before, after = make_snapshots()
+    diff = diff_snapshots(before, after)
+
+    assert diff.new_bad_tracks == ["Born", "New"]
+    assert diff.worsened_bad_tracks == ["Worse"]
+    assert diff.fixed_bad_tracks == ["Gone", "Fixed"]
+    assert diff.new_duplicates == [("E", "F")]
+    assert diff.fixed_duplicates == [("C", "D")]
+    assert diff.has_regressions()
+
+    assert not diff_snapshots(before, before).has_regressions()
+
+
+def test_save_load_snapshot(tmp_path) -> None:
+    before, _ = make_snapshots()
+    path = os.path.join(tmp_path, "shot.json")
+    save_snapshot(before, path)
+    assert load_snapshot(path) == before
+
+
+def test_main(tmp_path, capsys) -> None:
+    before, after = make_snapshots()
+    os.mkdir(os.path.join(tmp_path, "before"))
+    os.mkdir(os.path.join(tmp_path, "after"))
+    save_snapshot(before, os.path.join(tmp_path, "before", "shot.json"))
+    save_snapshot(after, os.path.join(tmp_path, "after", "shot.json"))
+    save_snapshot(before, os.path.join(tmp_path, "before", "other.json"))
+    save_snapshot(before, os.path.join(tmp_path, "after", "other.json"))
+
+    assert (
+        main([os.path.join(tmp_path, "before"), os.path.join(tmp_path, "after")]) == 1
+    )
+    output = capsys.readouterr().out.splitlines()
+    assert "shot.json: New bad track: Born 7.0 at frame 16" in output
+    assert "shot.json: Worse track: Worse 2.5 -> 6.0 at frame 30" in output
+    assert "shot.json: Gone bad track: Gone 4.0" in output
+    assert not any(line.startswith("other.json") for line in output)
+
+    path = os.path.join(tmp_path, "before", "shot.json")
+    assert main([path, path]) == 0
+
+    # A file compared to a directory means the same name in that directory
+    assert main([path, os.path.join(tmp_path, "after")]) == 1
+    assert main([os.path.join(tmp_path, "before"), path]) == 0
+
+
+def test_main_errors(tmp_path, capsys) -> None:
+    before, after = make_snapshots()
+    before_dir = os.path.join(tmp_path, "before")
+    after_dir = os.path.join(tmp_path, "after")
+    os.mkdir(before_dir)
+    os.mkdir(after_dir)
+    save_snapshot(before, os.path.join(before_dir, "shot.json"))
+    save_snapshot(after, os.path.join(after_dir, "shot.json"))
+    save_snapshot(before, os.path.join(before_dir, "dropped.json"))
+    save_snapshot(before, os.path.join(after_dir, "added.json"))
+    save_snapshot(before, os.path.join(before_dir, "broken.json"))
+    with open(os.path.join(after_dir, "broken.json"), "w", encoding="utf-8") as f:
+        f.write('{"version": 1, "bad_tracks": {}')
+
+    # Errors win over regressions, and don't stop the other shots from being
+    # compared
+    assert main([before_dir, after_dir]) == 2
+    captured = capsys.readouterr()
+    assert "shot.json: New bad track: Born 7.0 at frame 16" in captured.out
+    errors = captured.err.splitlines()
+    assert f"added.json: Only in {after_dir}" in errors
+    assert f"dropped.json: Only in {before_dir}" in errors
+    assert any(line.startswith("broken.json: Can't read snapshot") for line in errors)
+
+    # The same name in a directory that doesn't have it
+    assert main([os.path.join(before_dir, "dropped.json"), after_dir]) == 2
+
+
+def test_diff_snapshots_performance() -> None:
+    before = Snapshot()
+    after = Snapshot()
+    for i in range(100_000):
+        before.bad_tracks[f"Track.{i:06}"] = (i % 7, i)
+        after.bad_tracks[f"Track.{i:06}"] = (i % 5, i)
+        before.duplicates[(f"Track.{i:06}", f"Track.{i + 1:06}")] = i
+        after.duplicates[(f"Track.{i:06}", f"Track.{i + 2:06}")] = i
+
+    t0 = time.perf_counter()
+    diff = diff_snapshots(before, after)
+    t1 = time.perf_counter()
+
+    assert len(diff.new_duplicates) == 100_000
+    print(f"Diffing 100k tracks took {t1 - t0:.3f}s")
+
+    # A list scan based join would take minutes here
+    assert t1 - t0 < 5.0